@@ -5,13 +5,41 @@ class PyroConf(object):
     API_ID = int(getenv("API_ID"))
     API_HASH = getenv("API_HASH")
     BOT_TOKEN = getenv("BOT_TOKEN")
+    HELPER_BOT_TOKENS = getenv("HELPER_BOT_TOKENS", "").replace(",", " ").split()
     SESSION_STRING = getenv("SESSION_STRING")
+    SESSION_STRINGS = getenv("SESSION_STRINGS", "").replace(",", " ").split()
     
     BOT_START_TIME = time()
     MAX_CONCURRENT_DOWNLOADS = int(getenv("MAX_CONCURRENT_DOWNLOADS", "1"))
     MAX_CONCURRENT_UPLOADS = int(getenv("MAX_CONCURRENT_UPLOADS", "1"))
+    UPLOAD_WORKERS = int(getenv("UPLOAD_WORKERS", "4"))
     BATCH_SIZE = int(getenv("BATCH_SIZE", "1"))
-    FLOOD_WAIT_DELAY = int(getenv("FLOOD_WAIT_DELAY", "5"))
-    
-    RAPID_LIMIT = int(getenv("RAPID_LIMIT", "10"))
-    RAPID_WINDOW_DURATION = int(getenv("RAPID_WINDOW_DURATION", "120"))
\ No newline at end of file
+    PREFETCH_CHUNKS = int(getenv("PREFETCH_CHUNKS", "2"))
+    PROBE_WORKERS = int(getenv("PROBE_WORKERS", "2"))
+    REORDER_WINDOW = int(getenv("REORDER_WINDOW", "8"))
+    MEDIA_WORKERS = int(getenv("MEDIA_WORKERS", "0"))
+    DOWNLOAD_BUDGET_MB = int(getenv("DOWNLOAD_BUDGET_MB", "4096"))
+    MIN_FREE_DISK_MB = int(getenv("MIN_FREE_DISK_MB", "1024"))
+    SHM_STAGING_MB = int(getenv("SHM_STAGING_MB", "0"))
+    MEMORY_MEDIA_MB = int(getenv("MEMORY_MEDIA_MB", "10"))
+    MEMORY_POOL_MB = int(getenv("MEMORY_POOL_MB", "256"))
+
+    FILE_CACHE_PATH = getenv("FILE_CACHE_PATH", "file_cache.db")
+    FILE_CACHE_SIZE = int(getenv("FILE_CACHE_SIZE", "20000"))
+
+    DOWNLOAD_SEGMENTS = int(getenv("DOWNLOAD_SEGMENTS", "4"))
+    SEGMENT_MIN_SIZE_MB = int(getenv("SEGMENT_MIN_SIZE_MB", "64"))
+
+    STREAM_MODE = getenv("STREAM_MODE", "False").lower() == "true"
+    STREAM_BUFFER_CHUNKS = int(getenv("STREAM_BUFFER_CHUNKS", "8"))
+
+    JOURNAL_PATH = getenv("JOURNAL_PATH", "batch_journal.db")
+    PROGRESS_INTERVAL = float(getenv("PROGRESS_INTERVAL", "5"))
+
+    RATE_GET_MESSAGES = float(getenv("RATE_GET_MESSAGES", "3"))
+    RATE_SEND = float(getenv("RATE_SEND", "1"))
+    RATE_EDIT = float(getenv("RATE_EDIT", "0.5"))
+    RATE_BURST = int(getenv("RATE_BURST", "3"))
+    RATE_DECREASE_FACTOR = float(getenv("RATE_DECREASE_FACTOR", "0.5"))
+    RATE_INCREASE_STEP = float(getenv("RATE_INCREASE_STEP", "0.1"))
+    RATE_PROBE_INTERVAL = int(getenv("RATE_PROBE_INTERVAL", "30"))
@@ -0,0 +1,108 @@
+import os
+import shutil
+import asyncio
+import itertools
+from time import monotonic
+
+from helpers.files import get_readable_file_size
+from config import PyroConf
+
+DISK_POLL_INTERVAL = 5
+STARVATION_TIMEOUT = 60
+
+class ByteBudget:
+    def __init__(self, max_bytes: int, headroom: int, path: str):
+        self.max_bytes = max_bytes
+        self.headroom = headroom
+        self.path = path
+        self.in_flight = 0
+        self.waiting = {}
+        self.counter = itertools.count()
+        self.changed = asyncio.Event()
+
+    def written_bytes(self) -> int:
+        written = 0
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                blocks = getattr(stat, "st_blocks", None)
+                written += blocks * 512 if blocks is not None else stat.st_size
+        return written
+
+    def free_bytes(self, needed: int = 0) -> int:
+        os.makedirs(self.path, exist_ok=True)
+        free = shutil.disk_usage(self.path).free
+        if free - self.in_flight - needed >= self.headroom:
+            return free - self.in_flight
+        return free - max(0, self.in_flight - self.written_bytes())
+
+    def _fits(self, size: int, ticket: int, urgent: bool = False) -> bool:
+        oldest = next(iter(self.waiting))
+        if not urgent and oldest != ticket and monotonic() - self.waiting[oldest] > STARVATION_TIMEOUT:
+            return False
+        if not urgent and self.in_flight and self.in_flight + size > self.max_bytes:
+            return False
+        if self.free_bytes(size) - size < self.headroom:
+            if urgent or not self.in_flight:
+                raise OSError(
+                    f"Not enough free disk space for {get_readable_file_size(size)} "
+                    f"(keeping {get_readable_file_size(self.headroom)} free)"
+                )
+            return False
+        return True
+
+    def _notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def acquire(self, size: int, urgent=None) -> int:
+        size = max(0, int(size or 0))
+        ticket = next(self.counter)
+        self.waiting[ticket] = monotonic()
+        try:
+            while True:
+                changed = self.changed
+                if self._fits(size, ticket, bool(urgent and urgent())):
+                    self.in_flight += size
+                    return size
+                try:
+                    await asyncio.wait_for(changed.wait(), DISK_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            del self.waiting[ticket]
+            self._notify()
+
+    def try_acquire(self, size: int) -> int:
+        size = max(0, int(size or 0))
+        if not size or self.in_flight + size > self.max_bytes:
+            return 0
+        self.in_flight += size
+        return size
+
+    def release(self, size: int) -> None:
+        if size:
+            self.in_flight = max(0, self.in_flight - size)
+            self._notify()
+
+    def wake(self) -> None:
+        if self.waiting:
+            self._notify()
+
+    def describe(self) -> str:
+        return (
+            f"{get_readable_file_size(self.in_flight)} / {get_readable_file_size(self.max_bytes)} in flight, "
+            f"{len(self.waiting)} waiting"
+        )
+
+
+DOWNLOAD_BUDGET = ByteBudget(
+    PyroConf.DOWNLOAD_BUDGET_MB * 1024 * 1024,
+    PyroConf.MIN_FREE_DISK_MB * 1024 * 1024,
+    "downloads"
+)
+
+MEMORY_BUDGET = ByteBudget(PyroConf.MEMORY_POOL_MB * 1024 * 1024, 0, "downloads")
@@ -0,0 +1,151 @@
+import sqlite3
+from time import time
+
+from pyrogram.errors import (
+    FileIdInvalid,
+    FileReferenceEmpty,
+    FileReferenceExpired,
+    FileReferenceInvalid,
+    FloodWait,
+    MediaEmpty,
+    MediaInvalid,
+)
+
+from helpers.files import get_readable_time
+from helpers.ratelimit import flood_pause
+from config import PyroConf
+from logger import LOGGER
+
+STALE_FILE_ID_ERRORS = (
+    FileIdInvalid,
+    FileReferenceEmpty,
+    FileReferenceExpired,
+    FileReferenceInvalid,
+    MediaEmpty,
+    MediaInvalid,
+)
+
+def get_media_object(chat_message):
+    return (
+        chat_message.document or chat_message.video or
+        chat_message.audio or chat_message.photo or
+        chat_message.animation or chat_message.voice or
+        chat_message.video_note or chat_message.sticker
+    )
+
+
+class FileIdCache:
+    def __init__(self, path: str, max_entries: int):
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(file_ids)")]
+        if columns and "owner_id" not in columns:
+            self.conn.execute("DROP TABLE file_ids")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_ids ("
+            "unique_id TEXT NOT NULL, "
+            "owner_id INTEGER NOT NULL, "
+            "chat_id TEXT, "
+            "message_id INTEGER, "
+            "file_id TEXT NOT NULL, "
+            "media_type TEXT, "
+            "last_used REAL NOT NULL, "
+            "PRIMARY KEY (unique_id, owner_id))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_file_ids_last_used ON file_ids (last_used)")
+        self.conn.commit()
+
+    def get(self, unique_id: str, owner_id: int):
+        row = self.conn.execute(
+            "SELECT file_id, media_type FROM file_ids WHERE unique_id = ? AND owner_id = ?", (unique_id, owner_id)
+        ).fetchone()
+        if row:
+            self.conn.execute(
+                "UPDATE file_ids SET last_used = ? WHERE unique_id = ? AND owner_id = ?", (time(), unique_id, owner_id)
+            )
+            self.conn.commit()
+        return row
+
+    def put(self, unique_id: str, owner_id: int, chat_id, message_id: int, file_id: str, media_type: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO file_ids VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (unique_id, owner_id, str(chat_id), message_id, file_id, media_type, time())
+        )
+        overflow = self.conn.execute("SELECT COUNT(*) FROM file_ids").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self.conn.execute(
+                "DELETE FROM file_ids WHERE rowid IN "
+                "(SELECT rowid FROM file_ids ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+        self.conn.commit()
+
+    def invalidate(self, unique_id: str, owner_id: int) -> None:
+        self.conn.execute("DELETE FROM file_ids WHERE unique_id = ? AND owner_id = ?", (unique_id, owner_id))
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM file_ids").fetchone()[0]
+
+
+FILE_CACHE = FileIdCache(PyroConf.FILE_CACHE_PATH, PyroConf.FILE_CACHE_SIZE)
+
+def get_cached_file_id(chat_message, bot):
+    source = get_media_object(chat_message)
+    if not source:
+        return None
+    return FILE_CACHE.get(source.file_unique_id, bot.me.id)
+
+
+def invalidate_cached(chat_message, bot) -> None:
+    source = get_media_object(chat_message)
+    if source:
+        FILE_CACHE.invalidate(source.file_unique_id, bot.me.id)
+
+
+def remember_upload(chat_message, sent_message, media_type: str) -> None:
+    source = get_media_object(chat_message)
+    sent = get_media_object(sent_message) if sent_message else None
+    if not source or not sent:
+        return
+    try:
+        FILE_CACHE.put(
+            source.file_unique_id, sent_message._client.me.id,
+            chat_message.chat.id, chat_message.id, sent.file_id, media_type
+        )
+    except sqlite3.Error as e:
+        LOGGER(__name__).warning(f"Failed to cache file_id for {chat_message.id}: {e}")
+
+
+async def resend_from_cache(bot, chat_message, target_chat_id, caption, reply_markup=None):
+    cached = get_cached_file_id(chat_message, bot)
+    if not cached:
+        return None
+    file_id, _ = cached
+
+    max_retries = 3
+    retry_count = 1
+
+    while retry_count <= max_retries:
+        try:
+            return await bot.send_cached_media(
+                chat_id=target_chat_id,
+                file_id=file_id,
+                caption=caption or "",
+                reply_markup=reply_markup
+            )
+        except FloodWait as e:
+            wait_s = int(getattr(e, "value", 0) or 0)
+            LOGGER(__name__).warning(f"FloodWait resending cached media: Sleeping {get_readable_time(wait_s)}")
+            await flood_pause(bot, "send", wait_s)
+            retry_count += 1
+            continue
+        except STALE_FILE_ID_ERRORS as e:
+            LOGGER(__name__).info(f"Cached file_id rejected for {chat_message.id}: {e}. Invalidating.")
+            invalidate_cached(chat_message, bot)
+            return None
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to resend cached media {chat_message.id} to {target_chat_id}: {e}")
+            return None
+
+    return None
@@ -0,0 +1,80 @@
+import asyncio
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait, FloodPremiumWait
+from pyrogram.session import Session
+
+from helpers.stream import MediaPipe, save_stream
+from helpers.upload import save_parallel, use_parallel_upload
+from helpers.ratelimit import FloodCoordinator, RateLimiter, classify_rpc, default_rates
+from logger import LOGGER
+
+class ManagedClient(Client):
+    def __init__(self, *args, warm_peers=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.warm_peers = warm_peers
+        self.warmer = None
+        self.rate_limiter = RateLimiter(default_rates())
+        self.flood = FloodCoordinator()
+        self.presaved = {}
+        self.partial_uploads = {}
+
+    async def start(self):
+        result = await super().start()
+        if self.warm_peers:
+            self.warmer = asyncio.create_task(self._warm_peers())
+        return result
+
+    async def _warm_peers(self):
+        count = 0
+        try:
+            async for _ in self.get_dialogs():
+                count += 1
+            LOGGER(__name__).info(f"[{self.name}] Cached peers from {count} dialogs")
+        except Exception as e:
+            LOGGER(__name__).warning(f"[{self.name}] Peer warm-up stopped after {count} dialogs: {e}")
+
+    async def invoke(self, query, retries=Session.MAX_RETRIES, timeout=Session.WAIT_TIMEOUT, sleep_threshold=None):
+        family = classify_rpc(query)
+        if family is None:
+            return await super().invoke(query, retries, timeout, sleep_threshold)
+
+        bucket = self.rate_limiter.buckets[family]
+        threshold = sleep_threshold if sleep_threshold is not None else self.sleep_threshold
+        while True:
+            await self.flood.wait(family)
+            await bucket.acquire()
+            try:
+                result = await super().invoke(query, retries, timeout, 0)
+            except (FloodWait, FloodPremiumWait) as e:
+                wait_s = int(getattr(e, "value", 0) or 0)
+                self.flood.block(family, wait_s)
+                bucket.on_flood()
+                LOGGER(__name__).warning(
+                    f"[{self.name}] FloodWait {wait_s}s on {type(query).__name__}, rate lowered to {bucket.rate:.2f}/s"
+                )
+                if wait_s > threshold:
+                    raise
+                continue
+            bucket.on_success()
+            return result
+
+    async def presave_file(self, path):
+        input_file = await self.save_file(path)
+        if not input_file:
+            raise IOError("Upload returned no file")
+        self.presaved[path] = input_file
+
+    def forget_presaved(self, path):
+        self.presaved.pop(path, None)
+
+    async def save_file(self, path, file_id=None, file_part=0, progress=None, progress_args=()):
+        if isinstance(path, MediaPipe):
+            if file_id is not None:
+                raise IOError("A streamed upload cannot resend missing parts")
+            return await save_stream(self, path)
+        if file_id is None and path in self.presaved:
+            return self.presaved.pop(path)
+        if file_id is None and progress is None and use_parallel_upload(path):
+            return await save_parallel(self, path)
+        return await super().save_file(path, file_id, file_part, progress, progress_args)
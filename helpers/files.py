@@ -1,21 +1,73 @@
 import os
+import shutil
+import tempfile
+from io import BytesIO
 from typing import Optional
 
+from config import PyroConf
 from logger import LOGGER
 
 SIZE_UNITS = ["B", "KB", "MB", "GB"]
+SHM_ROOT = "/dev/shm/save-restricted-content"
+SCRATCH_DIRS = set()
+SHM_STAGED = {}
 
-def get_download_path(folder_id: int, filename: str, root_dir: str = "downloads") -> str:
+def shm_has_room(file_size: int) -> bool:
+    try:
+        free = shutil.disk_usage("/dev/shm").free
+    except OSError:
+        return False
+    return free - sum(SHM_STAGED.values()) - file_size >= 0
+
+
+def get_staging_root(file_size: int = 0) -> str:
+    limit = PyroConf.SHM_STAGING_MB * 1024 * 1024
+    if limit and 0 < file_size <= limit and os.access("/dev/shm", os.W_OK) and shm_has_room(file_size):
+        return SHM_ROOT
+    return "downloads"
+
+
+def get_download_path(folder_id: int, filename: str, root_dir: str = None, file_size: int = 0) -> str:
+    root_dir = root_dir or get_staging_root(file_size)
     os.makedirs(root_dir, exist_ok=True)
-    return os.path.join(root_dir, filename)
+    scratch_dir = os.path.abspath(tempfile.mkdtemp(prefix=f"{folder_id}_", dir=root_dir))
+    SCRATCH_DIRS.add(scratch_dir)
+    if root_dir == SHM_ROOT:
+        SHM_STAGED[scratch_dir] = file_size
+    return os.path.join(scratch_dir, filename)
+
+
+def get_media_size(media) -> int:
+    if isinstance(media, BytesIO):
+        return media.getbuffer().nbytes
+    return os.path.getsize(media)
+
+
+def get_media_name(media) -> str:
+    if isinstance(media, BytesIO):
+        return media.name
+    return os.path.basename(media)
 
 
 def cleanup_download(path: str) -> None:
+    if isinstance(path, BytesIO):
+        path.close()
+        return
+
     try:
+        scratch_dir = os.path.dirname(os.path.abspath(path))
+        if scratch_dir in SCRATCH_DIRS:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            SCRATCH_DIRS.discard(scratch_dir)
+            SHM_STAGED.pop(scratch_dir, None)
+            return
+
         if os.path.exists(path):
             os.remove(path)
         if os.path.exists(path + ".temp"):
             os.remove(path + ".temp")
+        if os.path.exists(path + ".part"):
+            os.remove(path + ".part")
 
     except Exception as e:
         LOGGER(__name__).error(f"Cleanup failed for {path}: {e}")
@@ -0,0 +1,65 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+class Flight:
+    def __init__(self):
+        self.result = None
+        self.done = asyncio.Event()
+        self.borrowers = 0
+        self.returned = asyncio.Event()
+
+    def publish(self, result) -> None:
+        self.result = result
+
+    def _give_back(self) -> None:
+        self.borrowers -= 1
+        if not self.borrowers:
+            self.returned.set()
+
+
+class SingleFlight:
+    def __init__(self):
+        self.flights = {}
+
+    @property
+    def active(self) -> int:
+        return len(self.flights)
+
+    @asynccontextmanager
+    async def join(self, key):
+        if key is None:
+            yield True, None
+            return
+
+        while True:
+            flight = self.flights.get(key)
+            if flight is None:
+                break
+            flight.borrowers += 1
+            try:
+                await flight.done.wait()
+            except BaseException:
+                flight._give_back()
+                raise
+            if flight.result is None:
+                flight._give_back()
+                continue
+            try:
+                yield False, flight
+            finally:
+                flight._give_back()
+            return
+
+        flight = self.flights[key] = Flight()
+        try:
+            yield True, flight
+        finally:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+            flight.done.set()
+            while flight.borrowers:
+                flight.returned.clear()
+                await flight.returned.wait()
+
+
+POST_FLIGHTS = SingleFlight()
@@ -0,0 +1,99 @@
+import sqlite3
+from time import time
+
+from config import PyroConf
+
+ITEM_STATES = ("pending", "downloaded", "sent", "failed", "skipped")
+
+class BatchJournal:
+    def __init__(self, path: str):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "batch_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "requester_chat_id INTEGER NOT NULL, "
+            "start_chat TEXT NOT NULL, "
+            "start_id INTEGER NOT NULL, "
+            "end_id INTEGER NOT NULL, "
+            "filter_type TEXT NOT NULL, "
+            "prefix TEXT NOT NULL, "
+            "target_chat_id TEXT NOT NULL, "
+            "status TEXT NOT NULL, "
+            "created REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "batch_id INTEGER NOT NULL, "
+            "message_id INTEGER NOT NULL, "
+            "state TEXT NOT NULL, "
+            "updated REAL NOT NULL, "
+            "PRIMARY KEY (batch_id, message_id))"
+        )
+        self.conn.commit()
+
+    def start_batch(self, job: dict, requester_chat_id: int, target_chat_ids: list) -> int:
+        cursor = self.conn.execute(
+            "INSERT INTO batches (requester_chat_id, start_chat, start_id, end_id, filter_type, prefix, target_chat_id, status, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 'running', ?)",
+            (
+                requester_chat_id, str(job["start_chat"]), job["start_id"], job["end_id"],
+                job["filter_type"], job["prefix"], ",".join(str(chat_id) for chat_id in target_chat_ids), time()
+            )
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def set_status(self, batch_id: int, status: str) -> None:
+        self.conn.execute("UPDATE batches SET status = ? WHERE batch_id = ?", (status, batch_id))
+        self.conn.commit()
+
+    def mark(self, batch_id: int, message_id: int, state: str) -> None:
+        if state not in ITEM_STATES:
+            raise ValueError(f"Unknown journal state: {state}")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?)",
+            (batch_id, message_id, state, time())
+        )
+        self.conn.commit()
+
+    def sent_ids(self, batch_id: int) -> set:
+        rows = self.conn.execute(
+            "SELECT message_id FROM items WHERE batch_id = ? AND state = 'sent'", (batch_id,)
+        ).fetchall()
+        return {row["message_id"] for row in rows}
+
+    def get_batch(self, batch_id: int):
+        return self.conn.execute("SELECT * FROM batches WHERE batch_id = ?", (batch_id,)).fetchone()
+
+    def unfinished_batches(self, requester_chat_id: int) -> list:
+        return self.conn.execute(
+            "SELECT b.*, "
+            "(SELECT COUNT(*) FROM items i WHERE i.batch_id = b.batch_id AND i.state = 'sent') AS sent "
+            "FROM batches b WHERE requester_chat_id = ? AND status != 'completed' ORDER BY batch_id DESC",
+            (requester_chat_id,)
+        ).fetchall()
+
+
+def parse_chat_ref(value: str):
+    return int(value) if value.lstrip("-").isdigit() else value
+
+
+def parse_chat_refs(value: str) -> list:
+    return [parse_chat_ref(ref) for ref in value.split(",")]
+
+
+def job_from_batch(row) -> dict:
+    return {
+        "batch_id": row["batch_id"],
+        "start_chat": parse_chat_ref(row["start_chat"]),
+        "start_id": row["start_id"],
+        "end_id": row["end_id"],
+        "filter_type": row["filter_type"],
+        "prefix": row["prefix"],
+    }
+
+
+JOURNAL = BatchJournal(PyroConf.JOURNAL_PATH)
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+from helpers.cache import get_media_object
+from logger import LOGGER
+
+MEDIA_INFO_CACHE_SIZE = 2048
+
+class MediaInfoCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, unique_id: str):
+        media_info = self.entries.get(unique_id)
+        if media_info is not None:
+            self.entries.move_to_end(unique_id)
+        return media_info
+
+    def put(self, unique_id: str, media_info: tuple) -> None:
+        self.entries[unique_id] = media_info
+        self.entries.move_to_end(unique_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+MEDIA_INFO_CACHE = MediaInfoCache(MEDIA_INFO_CACHE_SIZE)
+
+def get_unique_id(chat_message):
+    media = get_media_object(chat_message) if chat_message else None
+    return getattr(media, "file_unique_id", None)
+
+
+def get_source_media_info(chat_message):
+    if chat_message is None:
+        return None
+    if chat_message.video:
+        video = chat_message.video
+        if video.duration and video.width and video.height:
+            return video.duration, None, None, video.width, video.height
+    elif chat_message.audio:
+        audio = chat_message.audio
+        if audio.duration:
+            return audio.duration, audio.performer, audio.title, None, None
+    return None
+
+
+async def download_source_thumb(chat_message, thumb_path):
+    media = chat_message.video if chat_message else None
+    if not media or not media.thumbs:
+        return None
+
+    thumb = max(media.thumbs, key=lambda t: (t.width or 0) * (t.height or 0))
+    try:
+        return await chat_message._client.download_media(thumb.file_id, file_name=thumb_path)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Source thumbnail download failed for {chat_message.id}: {e}")
+        return None
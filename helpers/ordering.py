@@ -0,0 +1,32 @@
+import asyncio
+
+class ReorderBuffer:
+    def __init__(self, window: int):
+        self.window = max(1, window)
+        self.next_seq = 0
+        self.finished = set()
+        self.changed = asyncio.Event()
+
+    def _notify(self):
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    async def _wait_until(self, ready):
+        while True:
+            changed = self.changed
+            if ready():
+                return
+            await changed.wait()
+
+    async def admit(self, seq: int) -> None:
+        await self._wait_until(lambda: seq < self.next_seq + self.window)
+
+    async def wait_turn(self, seq: int) -> None:
+        await self._wait_until(lambda: seq <= self.next_seq)
+
+    def complete(self, seq: int) -> None:
+        self.finished.add(seq)
+        while self.next_seq in self.finished:
+            self.finished.remove(self.next_seq)
+            self.next_seq += 1
+        self._notify()
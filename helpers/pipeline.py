@@ -0,0 +1,109 @@
+import asyncio
+
+from logger import LOGGER
+
+_DONE = object()
+
+class Stage:
+    def __init__(self, name, handler, workers=1, wants=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.wants = wants or (lambda item: True)
+
+
+class Pipeline:
+    def __init__(self, stages, queue_size=1, on_complete=None, on_error=None, on_abort=None):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.on_abort = on_abort
+        self.queues = []
+        self.active = {}
+
+    async def _finish(self, item):
+        if self.on_complete:
+            try:
+                await self.on_complete(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER(__name__).error(f"Completion callback failed: {e}")
+        self.active.pop(id(item), None)
+
+    async def _fail(self, item, error):
+        if self.on_error:
+            try:
+                await self.on_error(item, error)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER(__name__).error(f"Error callback failed: {e}")
+        self.active.pop(id(item), None)
+
+    def _abort_active(self):
+        for item in list(self.active.values()):
+            try:
+                if self.on_abort:
+                    self.on_abort(item)
+            except Exception as e:
+                LOGGER(__name__).error(f"Abort callback failed: {e}")
+        self.active.clear()
+
+    async def _route(self, item, after):
+        for index in range(after + 1, len(self.stages)):
+            if self.stages[index].wants(item):
+                await self.queues[index].put(item)
+                return
+        await self._finish(item)
+
+    async def _work(self, index):
+        stage = self.stages[index]
+        queue = self.queues[index]
+
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                return
+
+            try:
+                result = await stage.handler(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                LOGGER(__name__).error(f"Stage '{stage.name}' failed: {e}")
+                await self._fail(item, e)
+                continue
+
+            if result is None:
+                await self._finish(item)
+            else:
+                if result is not item:
+                    self.active.pop(id(item), None)
+                    self.active[id(result)] = result
+                await self._route(result, index)
+
+    async def run(self, source):
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+        workers = [
+            [asyncio.create_task(self._work(index)) for _ in range(stage.workers)]
+            for index, stage in enumerate(self.stages)
+        ]
+
+        try:
+            async for item in source:
+                self.active[id(item)] = item
+                await self._route(item, -1)
+
+            for index, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    await self.queues[index].put(_DONE)
+                await asyncio.gather(*stage_workers)
+        finally:
+            for stage_workers in workers:
+                for task in stage_workers:
+                    if not task.done():
+                        task.cancel()
+            await asyncio.gather(*(task for stage_workers in workers for task in stage_workers), return_exceptions=True)
+            self._abort_active()
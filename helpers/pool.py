@@ -0,0 +1,147 @@
+import asyncio
+from time import monotonic
+from contextlib import asynccontextmanager
+
+from pyrogram.errors import (
+    FloodWait,
+    FileReferenceExpired,
+    PeerIdInvalid,
+    ChannelPrivate,
+    ChannelInvalid
+)
+
+from helpers.routing import get_source_ref
+from logger import LOGGER
+
+ACCESS_DENY_TTL = 600
+FAILOVER_ERRORS = (FloodWait, FileReferenceExpired, PeerIdInvalid, ChannelPrivate, ChannelInvalid)
+ACCESS_ERRORS = (PeerIdInvalid, ChannelPrivate, ChannelInvalid)
+
+class PoolMember:
+    def __init__(self, client, limit: int):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(limit)
+        self.load = 0
+        self.access = {}
+        self.denied = {}
+
+    def access_for(self, chat_id):
+        expiry = self.denied.get(chat_id)
+        if expiry is not None:
+            if monotonic() < expiry:
+                return False
+            del self.denied[chat_id]
+        return self.access.get(chat_id)
+
+    def grant(self, chat_id):
+        self.denied.pop(chat_id, None)
+        self.access[chat_id] = True
+
+    def deny(self, chat_id):
+        self.access.pop(chat_id, None)
+        self.denied[chat_id] = monotonic() + ACCESS_DENY_TTL
+
+    def blocked_for(self, family: str) -> float:
+        return self.client.flood.gate(family).remaining()
+
+
+class ClientPool:
+    def __init__(self, clients, limit: int, family: str):
+        self.members = [PoolMember(client, limit) for client in clients]
+        self.family = family
+
+    def __len__(self):
+        return len(self.members)
+
+    @property
+    def primary(self):
+        return self.members[0].client
+
+    def candidates(self, chat_id, exclude=()):
+        members = [
+            member for member in self.members
+            if member not in exclude and member.access_for(chat_id) is not False
+        ]
+        return sorted(
+            members,
+            key=lambda member: (
+                member.blocked_for(self.family) > 0,
+                member.access_for(chat_id) is not True,
+                member.load,
+            )
+        )
+
+    def pick(self, chat_id, exclude=()):
+        candidates = self.candidates(chat_id, exclude)
+        return candidates[0] if candidates else None
+
+    @asynccontextmanager
+    async def lease(self, chat_id, member=None):
+        member = member or self.pick(chat_id) or self.members[0]
+        async with member.semaphore:
+            member.load += 1
+            try:
+                yield member.client
+            finally:
+                member.load -= 1
+
+    async def wait_any(self):
+        gates = [member.client.flood.gate(self.family) for member in self.members]
+        if any(gate.remaining() <= 0 for gate in gates):
+            return
+        waiters = [asyncio.create_task(gate.wait()) for gate in gates]
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    def describe(self) -> str:
+        return " | ".join(
+            f"{member.client.name}: {member.load} active"
+            + (f", blocked {int(member.blocked_for(self.family))}s" if member.blocked_for(self.family) > 0 else "")
+            for member in self.members
+        )
+
+
+class SessionPool(ClientPool):
+    def __init__(self, clients, limit: int):
+        super().__init__(clients, limit, "download")
+
+    async def resolve(self, member, chat_id, message):
+        if message is not None and message._client is member.client:
+            return message
+        return await member.client.get_messages(chat_id=get_source_ref(message), message_ids=message.id)
+
+    async def run(self, message, func):
+        chat_id = message.chat.id
+        tried = []
+        last_error = None
+
+        while True:
+            member = self.pick(chat_id, exclude=tried)
+            if member is None:
+                if last_error:
+                    raise last_error
+                raise PeerIdInvalid()
+            tried.append(member)
+
+            try:
+                source = await self.resolve(member, chat_id, message)
+                if not source or source.empty:
+                    member.deny(chat_id)
+                    continue
+
+                async with self.lease(chat_id, member) as client:
+                    await client.flood.wait(self.family)
+                    result = await func(client, source)
+                member.grant(chat_id)
+                return result, source
+            except FAILOVER_ERRORS as e:
+                if isinstance(e, FloodWait):
+                    member.client.flood.block(self.family, int(getattr(e, "value", 0) or 0))
+                elif isinstance(e, ACCESS_ERRORS):
+                    member.deny(chat_id)
+                LOGGER(__name__).warning(f"[{member.client.name}] {type(e).__name__} on {chat_id}/{message.id}, failing over")
+                last_error = e
+                continue
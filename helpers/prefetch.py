@@ -0,0 +1,123 @@
+import asyncio
+from time import time
+from collections import deque
+
+from pyrogram import raw, utils
+from pyrogram.enums import MessagesFilter
+
+from logger import LOGGER
+
+FILE_REFERENCE_TTL = 7200
+REFRESH_MARGIN = 600
+WINDOW_SIZE = 1000
+PAGE_SIZE = 100
+GET_MESSAGES_LIMIT = 200
+
+BATCH_FILTERS = {
+    "video": MessagesFilter.VIDEO,
+    "doc": MessagesFilter.DOCUMENT,
+    "photo": MessagesFilter.PHOTO,
+    "audio": MessagesFilter.AUDIO,
+}
+
+def plan_windows(start_id: int, end_id: int, size: int = WINDOW_SIZE) -> list:
+    return [(low, min(low + size - 1, end_id)) for low in range(start_id, end_id + 1, size)]
+
+
+async def fetch_chunk(client, chat_id, message_ids):
+    fetch_time = time()
+    messages = []
+    for index in range(0, len(message_ids), GET_MESSAGES_LIMIT):
+        batch = await client.get_messages(chat_id=chat_id, message_ids=message_ids[index:index + GET_MESSAGES_LIMIT])
+        messages.extend(batch if isinstance(batch, list) else [batch])
+    return fetch_time, messages
+
+
+async def fetch_window(client, chat_id, low, high, media_filter=None):
+    fetch_time = time()
+    peer = await client.resolve_peer(chat_id)
+    collected = {}
+    offset_id = high + 1
+
+    while offset_id > low:
+        params = dict(
+            peer=peer, offset_id=offset_id, add_offset=0, limit=PAGE_SIZE,
+            max_id=high + 1, min_id=low - 1, hash=0
+        )
+        if media_filter is None:
+            r = await client.invoke(raw.functions.messages.GetHistory(offset_date=0, **params))
+        else:
+            r = await client.invoke(raw.functions.messages.Search(
+                q="", filter=media_filter.value(), min_date=0, max_date=0, **params
+            ))
+
+        if not r.messages:
+            break
+        for message in await utils.parse_messages(client, r, replies=0):
+            if message and not message.empty and low <= message.id <= high:
+                collected[message.id] = message
+        offset_id = min(message.id for message in r.messages)
+        if len(r.messages) < PAGE_SIZE:
+            break
+
+    return fetch_time, [collected[message_id] for message_id in sorted(collected)]
+
+
+def local_album(messages, index, complete_window):
+    message = messages[index]
+    if not complete_window or not message or not message.media_group_id:
+        return None
+    album = [msg for msg in messages if msg and msg.media_group_id == message.media_group_id]
+    if album[0] is messages[0] or album[-1] is messages[-1]:
+        return None
+    return album
+
+
+async def prefetch_messages(client, chat_id, windows, media_filter=None, depth=2, on_skip=None, on_error=None):
+    pending = deque()
+    next_window = 0
+    max_age = FILE_REFERENCE_TTL - REFRESH_MARGIN
+
+    def fill():
+        nonlocal next_window
+        while len(pending) < max(1, depth) and next_window < len(windows):
+            low, high = windows[next_window]
+            pending.append((low, high, asyncio.create_task(fetch_window(client, chat_id, low, high, media_filter))))
+            next_window += 1
+
+    try:
+        fill()
+        while pending:
+            low, high, task = pending.popleft()
+            try:
+                fetch_time, messages = await task
+            except Exception as e:
+                LOGGER(__name__).error(f"Error fetching messages {low}-{high}: {e}")
+                if on_error:
+                    on_error(high - low + 1, e)
+                fill()
+                continue
+            fill()
+
+            if on_skip and len(messages) < high - low + 1:
+                on_skip(high - low + 1 - len(messages))
+
+            index = 0
+            can_refresh = True
+            complete_window = media_filter is None
+            while index < len(messages):
+                if can_refresh and time() - fetch_time > max_age:
+                    stale_ids = [msg.id for msg in messages[index:] if msg]
+                    LOGGER(__name__).info(f"Refreshing {len(stale_ids)} messages close to file reference expiry")
+                    try:
+                        fetch_time, messages = await fetch_chunk(client, chat_id, stale_ids)
+                        index = 0
+                    except Exception as e:
+                        LOGGER(__name__).warning(f"Failed to refresh stale chunk: {e}")
+                        can_refresh = False
+                    continue
+                yield messages[index], fetch_time, local_album(messages, index, complete_window)
+                index += 1
+    finally:
+        for _, _, task in pending:
+            task.cancel()
@@ -0,0 +1,68 @@
+import asyncio
+from time import monotonic
+
+from pyrogram.errors import FloodWait, MessageNotModified
+
+from helpers.ratelimit import flood_pause
+from logger import LOGGER
+
+class ProgressEditor:
+    def __init__(self, message, interval: float):
+        self.message = message
+        self.interval = interval
+        self.pending = None
+        self.last_text = None
+        self.last_flush = 0.0
+        self.flusher = None
+        self.edits = 0
+        self.skipped = 0
+
+    def __getattr__(self, name):
+        return getattr(self.message, name)
+
+    async def edit(self, text: str, **kwargs):
+        if self.pending is not None:
+            self.skipped += 1
+        self.pending = text
+        if self.flusher is None or self.flusher.done():
+            self.flusher = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        while self.pending is not None:
+            delay = self.last_flush + self.interval - monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            text, self.pending = self.pending, None
+            if text == self.last_text:
+                self.skipped += 1
+                continue
+
+            try:
+                await self.message.edit(text)
+                self.last_text = text
+                self.edits += 1
+            except MessageNotModified:
+                self.last_text = text
+            except FloodWait as e:
+                wait_s = int(getattr(e, "value", 0) or 0)
+                LOGGER(__name__).warning(f"FloodWait on progress edit: backing off {wait_s}s")
+                if self.pending is None:
+                    self.pending = text
+                await flood_pause(self.message._client, "edit", wait_s)
+            except Exception as e:
+                LOGGER(__name__).debug(f"Progress edit dropped: {e}")
+            self.last_flush = monotonic()
+
+    async def stop(self):
+        self.pending = None
+        if self.flusher and not self.flusher.done():
+            self.flusher.cancel()
+            try:
+                await self.flusher
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    async def delete(self, *args, **kwargs):
+        await self.stop()
+        return await self.message.delete(*args, **kwargs)
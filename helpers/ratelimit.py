@@ -0,0 +1,160 @@
+import asyncio
+from time import monotonic
+
+from pyrogram import raw
+
+from config import PyroConf
+
+RPC_CLASSES = {
+    "get_messages": (
+        raw.functions.messages.GetMessages,
+        raw.functions.channels.GetMessages,
+        raw.functions.messages.GetHistory,
+        raw.functions.messages.Search,
+    ),
+    "send": (
+        raw.functions.messages.SendMessage,
+        raw.functions.messages.SendMedia,
+        raw.functions.messages.SendMultiMedia,
+        raw.functions.messages.UploadMedia,
+        raw.functions.messages.ForwardMessages,
+    ),
+    "edit": (
+        raw.functions.messages.EditMessage,
+        raw.functions.messages.DeleteMessages,
+        raw.functions.channels.DeleteMessages,
+        raw.functions.messages.UpdatePinnedMessage,
+    ),
+}
+
+def classify_rpc(query):
+    for rpc_class, functions in RPC_CLASSES.items():
+        if isinstance(query, functions):
+            return rpc_class
+    return None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, min_rate: float, max_rate: float):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = rate * PyroConf.RATE_INCREASE_STEP
+        self.tokens = float(self.capacity)
+        self.updated = monotonic()
+        self.last_change = monotonic()
+        self.floods = 0
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_flood(self):
+        self.floods += 1
+        self.rate = max(self.min_rate, self.rate * PyroConf.RATE_DECREASE_FACTOR)
+        self.tokens = 0
+        self.last_change = monotonic()
+
+    def on_success(self):
+        now = monotonic()
+        if now - self.last_change >= PyroConf.RATE_PROBE_INTERVAL:
+            self.rate = min(self.max_rate, self.rate + self.step)
+            self.last_change = now
+
+
+class RateLimiter:
+    def __init__(self, rates: dict):
+        self.buckets = {
+            rpc_class: TokenBucket(rate, PyroConf.RATE_BURST, rate / 10, rate * 4)
+            for rpc_class, rate in rates.items()
+        }
+
+    def describe(self) -> str:
+        return " | ".join(
+            f"{rpc_class}: {bucket.rate:.2f}/s"
+            for rpc_class, bucket in self.buckets.items()
+        )
+
+
+class FloodGate:
+    def __init__(self):
+        self.blocked_until = 0.0
+        self.opened = asyncio.Event()
+        self.opened.set()
+        self.timer = None
+
+    def remaining(self) -> float:
+        return max(0.0, self.blocked_until - monotonic())
+
+    def block(self, wait_s: float):
+        deadline = monotonic() + wait_s
+        if deadline <= self.blocked_until:
+            return
+        self.blocked_until = deadline
+        self.opened.clear()
+        if self.timer:
+            self.timer.cancel()
+        self.timer = asyncio.get_running_loop().call_later(wait_s, self._open)
+
+    def _open(self):
+        self.timer = None
+        self.opened.set()
+
+    async def wait(self):
+        await self.opened.wait()
+
+
+class FloodCoordinator:
+    def __init__(self):
+        self.gates = {}
+
+    def gate(self, family: str) -> FloodGate:
+        if family not in self.gates:
+            self.gates[family] = FloodGate()
+        return self.gates[family]
+
+    def block(self, family: str, wait_s: float):
+        self.gate(family).block(wait_s)
+
+    async def wait(self, family: str):
+        await self.gate(family).wait()
+
+    def describe(self) -> str:
+        blocked = [
+            f"{family}: {int(gate.remaining())}s"
+            for family, gate in self.gates.items() if gate.remaining() > 0
+        ]
+        return " | ".join(blocked) or "None"
+
+
+async def flood_gate(client, family: str):
+    coordinator = getattr(client, "flood", None)
+    if coordinator:
+        await coordinator.wait(family)
+
+
+async def flood_pause(client, family: str, wait_s: int):
+    coordinator = getattr(client, "flood", None)
+    if coordinator is None:
+        await asyncio.sleep(wait_s + 1)
+        return
+    coordinator.block(family, wait_s + 1)
+    await coordinator.wait(family)
+
+
+def default_rates() -> dict:
+    return {
+        "get_messages": PyroConf.RATE_GET_MESSAGES,
+        "send": PyroConf.RATE_SEND,
+        "edit": PyroConf.RATE_EDIT,
+    }
@@ -0,0 +1,104 @@
+from pyrogram.errors import (
+    FloodWait,
+    RPCError,
+    ChannelInvalid,
+    ChannelPrivate,
+    ChatForwardsRestricted,
+    PeerIdInvalid,
+    UserNotParticipant
+)
+
+from helpers.files import get_readable_time
+from helpers.msg import get_parsed_msg, clean_caption
+from helpers.ratelimit import flood_pause
+from logger import LOGGER
+
+ROUTE_STATS = {"copied": 0, "cached": 0, "transferred": 0, "copy_fallbacks": 0}
+COPY_DENIED_CHATS = set()
+COPY_DENIED_ERRORS = (ChatForwardsRestricted, ChannelPrivate, ChannelInvalid, PeerIdInvalid, UserNotParticipant)
+
+def get_source_ref(chat_message):
+    return chat_message.chat.username or chat_message.chat.id
+
+
+def can_copy(chat_message, bot) -> bool:
+    if chat_message.has_protected_content or chat_message.chat.has_protected_content:
+        return False
+    return (bot.me.id, chat_message.chat.id) not in COPY_DENIED_CHATS
+
+
+def record_route(route: str) -> None:
+    ROUTE_STATS[route] += 1
+
+
+async def _copy_with_retry(bot, copy_call, chat_message):
+    max_retries = 3
+    retry_count = 1
+
+    while retry_count <= max_retries:
+        try:
+            await copy_call()
+            return True
+        except FloodWait as e:
+            wait_s = int(getattr(e, "value", 0) or 0)
+            LOGGER(__name__).warning(f"FloodWait while copying: Sleeping {get_readable_time(wait_s)}")
+            await flood_pause(bot, "send", wait_s)
+            retry_count += 1
+            continue
+        except COPY_DENIED_ERRORS as e:
+            LOGGER(__name__).info(
+                f"Server-side copy unavailable for chat {chat_message.chat.id}: {e}. Falling back to download."
+            )
+            COPY_DENIED_CHATS.add((bot.me.id, chat_message.chat.id))
+            break
+        except RPCError as e:
+            LOGGER(__name__).info(f"Server-side copy of {chat_message.id} failed: {e}. Falling back to download.")
+            break
+        except Exception as e:
+            LOGGER(__name__).warning(f"Server-side copy failed: {e}. Falling back to download.")
+            break
+
+    ROUTE_STATS["copy_fallbacks"] += 1
+    return False
+
+
+async def copy_post(bot, chat_message, target_chat_id, caption, reply_markup=None) -> bool:
+    if not can_copy(chat_message, bot):
+        return False
+
+    async def _copy():
+        await bot.copy_message(
+            chat_id=target_chat_id,
+            from_chat_id=get_source_ref(chat_message),
+            message_id=chat_message.id,
+            caption=caption or "",
+            reply_markup=reply_markup
+        )
+
+    if await _copy_with_retry(bot, _copy, chat_message):
+        record_route("copied")
+        return True
+    return False
+
+
+async def copy_group(bot, chat_message, group_messages, target_chat_id) -> bool:
+    if not can_copy(chat_message, bot):
+        return False
+
+    captions = []
+    for msg in group_messages:
+        parsed_caption = await get_parsed_msg(msg.caption or "", msg.caption_entities)
+        captions.append(clean_caption(parsed_caption))
+
+    async def _copy():
+        await bot.copy_media_group(
+            chat_id=target_chat_id,
+            from_chat_id=get_source_ref(chat_message),
+            message_id=chat_message.id,
+            captions=captions
+        )
+
+    if await _copy_with_retry(bot, _copy, chat_message):
+        record_route("copied")
+        return True
+    return False
@@ -0,0 +1,64 @@
+import os
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from config import PyroConf
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+MEDIA_PRIORITY = ContextVar("media_priority", default=PRIORITY_BATCH)
+
+class MediaScheduler:
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self.running = 0
+        self.waiters = []
+        self.counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self, priority: int):
+        if self.running < self.slots and not self.waiters:
+            self.running += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self.counter), future)
+        heapq.heappush(self.waiters, entry)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif entry in self.waiters:
+                self.waiters.remove(entry)
+                heapq.heapify(self.waiters)
+            raise
+
+    def release(self):
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = None):
+        await self.acquire(MEDIA_PRIORITY.get() if priority is None else priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def describe(self) -> str:
+        return f"{self.running}/{self.slots} running, {self.queued} queued"
+
+
+MEDIA_SCHEDULER = MediaScheduler(PyroConf.MEDIA_WORKERS or os.cpu_count() or 1)
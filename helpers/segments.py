@@ -0,0 +1,155 @@
+import os
+import json
+import math
+import asyncio
+from time import monotonic
+
+from helpers.cache import get_media_object
+from config import PyroConf
+from logger import LOGGER
+
+STREAM_CHUNK_SIZE = 1024 * 1024
+CHECKPOINT_CHUNKS = 16
+CHECKPOINT_INTERVAL = 5
+MEMORY_TYPES = ("photo", "document")
+
+class IncompleteDownload(IOError):
+    def __init__(self, message: str, progressed: bool):
+        super().__init__(message)
+        self.progressed = progressed
+
+
+def plan_segments(file_size: int, segments: int) -> list:
+    total_chunks = math.ceil(file_size / STREAM_CHUNK_SIZE)
+    per_segment = math.ceil(total_chunks / max(1, segments))
+    return [
+        (first, min(per_segment, total_chunks - first))
+        for first in range(0, total_chunks, per_segment)
+    ]
+
+
+def use_segments(file_size: int) -> bool:
+    return PyroConf.DOWNLOAD_SEGMENTS > 1 and file_size >= PyroConf.SEGMENT_MIN_SIZE_MB * 1024 * 1024
+
+
+def use_memory(media_type: str, file_size: int) -> bool:
+    return media_type in MEMORY_TYPES and 0 < file_size <= PyroConf.MEMORY_MEDIA_MB * 1024 * 1024
+
+
+def load_progress(sidecar_path: str, unique_id: str, file_size: int):
+    try:
+        with open(sidecar_path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get("unique_id") != unique_id or state.get("size") != file_size:
+        return None
+    return state
+
+
+def save_progress(sidecar_path: str, state: dict) -> None:
+    with open(sidecar_path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(sidecar_path + ".tmp", sidecar_path)
+
+
+def verified_bytes(state: dict) -> int:
+    return min(state["size"], sum(done for _, _, done in state["segments"]) * STREAM_CHUNK_SIZE)
+
+
+async def _fetch_segment(client, chat_message, temp_path, sidecar_path, state, segment):
+    first, count, done = segment
+    start = (first + done) * STREAM_CHUNK_SIZE
+    expected = min((count - done) * STREAM_CHUNK_SIZE, state["size"] - start)
+    written = 0
+    unsaved = 0
+    last_checkpoint = monotonic()
+
+    def checkpoint():
+        nonlocal unsaved, last_checkpoint
+        f.flush()
+        segment[2] += unsaved
+        unsaved = 0
+        last_checkpoint = monotonic()
+        save_progress(sidecar_path, state)
+
+    with open(temp_path, "r+b") as f:
+        f.seek(start)
+        try:
+            async for chunk in client.stream_media(chat_message, limit=count - done, offset=first + done):
+                f.write(chunk)
+                written += len(chunk)
+                unsaved += 1
+                if unsaved >= CHECKPOINT_CHUNKS or monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL:
+                    checkpoint()
+        finally:
+            if unsaved:
+                checkpoint()
+
+    if written != expected:
+        raise IncompleteDownload(f"Segment at chunk {first} ended early: {written} of {expected} bytes", written > 0)
+
+
+async def download_segmented(client, chat_message, file_path, file_size, segments):
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(client.PARENT_DIR, file_path)
+    file_path = os.path.abspath(file_path)
+    temp_path = file_path + ".temp"
+    sidecar_path = file_path + ".part"
+    unique_id = get_media_object(chat_message).file_unique_id
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    state = load_progress(sidecar_path, unique_id, file_size) if os.path.exists(temp_path) else None
+    if state is None:
+        state = {
+            "unique_id": unique_id,
+            "size": file_size,
+            "segments": [[first, count, 0] for first, count in plan_segments(file_size, segments)],
+        }
+        with open(temp_path, "wb") as f:
+            f.truncate(file_size)
+        save_progress(sidecar_path, state)
+    else:
+        LOGGER(__name__).info(
+            f"Resuming {os.path.basename(file_path)} from {verified_bytes(state)} of {file_size} bytes"
+        )
+
+    pending = [segment for segment in state["segments"] if segment[2] < segment[1]]
+    LOGGER(__name__).info(f"Downloading {os.path.basename(file_path)} in {len(pending)} segments")
+
+    before = verified_bytes(state)
+    tasks = [
+        asyncio.create_task(_fetch_segment(client, chat_message, temp_path, sidecar_path, state, segment))
+        for segment in pending
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException as e:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        LOGGER(__name__).warning(
+            f"Keeping partial {os.path.basename(file_path)}: {verified_bytes(state)} of {file_size} bytes verified"
+        )
+        if isinstance(e, IncompleteDownload):
+            raise IncompleteDownload(str(e), verified_bytes(state) > before) from e
+        raise
+
+    os.replace(temp_path, file_path)
+    os.remove(sidecar_path)
+    return file_path
+
+
+async def download_file(client, chat_message, file_path, file_size):
+    if file_size > 0:
+        segments = PyroConf.DOWNLOAD_SEGMENTS if use_segments(file_size) else 1
+        return await download_segmented(client, chat_message, file_path, file_size, segments)
+    return await chat_message.download(file_name=file_path)
+
+
+async def download_to_memory(client, chat_message, filename, file_size):
+    buffer = await client.download_media(chat_message, file_name=filename, in_memory=True)
+    received = buffer.getbuffer().nbytes if buffer else 0
+    if received < file_size:
+        raise IncompleteDownload(f"Received {received} of {file_size} bytes in memory", False)
+    return buffer
@@ -0,0 +1,145 @@
+import io
+import math
+import asyncio
+from hashlib import md5
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+from pyrogram.session import Session
+
+from helpers.files import get_readable_time
+from helpers.pool import FAILOVER_ERRORS
+from helpers.ratelimit import flood_gate, flood_pause
+from logger import LOGGER
+
+UPLOAD_PART_SIZE = 512 * 1024
+BIG_FILE_THRESHOLD = 10 * 1024 * 1024
+STREAMABLE_TYPES = ("photo", "document")
+
+class MediaPipe(io.RawIOBase):
+    def __init__(self, name: str, size: int, max_chunks: int):
+        super().__init__()
+        self.name = name
+        self.size = size
+        self.queue = asyncio.Queue(maxsize=max_chunks)
+        self.producer = None
+        self.error = None
+
+    def readable(self):
+        return True
+
+    def start(self, user_client, chat_message):
+        self.producer = asyncio.create_task(self._produce(user_client, chat_message))
+
+    async def _produce(self, user_client, chat_message):
+        try:
+            await flood_gate(user_client, "download")
+            async for chunk in user_client.stream_media(chat_message):
+                await self.queue.put(chunk)
+        except Exception as e:
+            self.error = e
+            await self.queue.put(e)
+            return
+        await self.queue.put(None)
+
+    async def chunks(self):
+        while True:
+            item = await self.queue.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def stop(self):
+        if self.producer and not self.producer.done():
+            self.producer.cancel()
+            try:
+                await self.producer
+            except (asyncio.CancelledError, Exception):
+                pass
+
+
+async def save_stream(client, pipe: MediaPipe):
+    file_id = client.rnd_id()
+    total_parts = int(math.ceil(pipe.size / UPLOAD_PART_SIZE))
+    is_big = pipe.size > BIG_FILE_THRESHOLD
+    md5_sum = md5() if not is_big else None
+
+    session = Session(
+        client, await client.storage.dc_id(), await client.storage.auth_key(),
+        await client.storage.test_mode(), is_media=True
+    )
+    await session.start()
+
+    part = 0
+    received = 0
+    buffer = bytearray()
+
+    async def _save_part(data):
+        nonlocal part
+        if is_big:
+            rpc = raw.functions.upload.SaveBigFilePart(
+                file_id=file_id, file_part=part, file_total_parts=total_parts, bytes=data
+            )
+        else:
+            rpc = raw.functions.upload.SaveFilePart(file_id=file_id, file_part=part, bytes=data)
+            md5_sum.update(data)
+        await session.invoke(rpc)
+        part += 1
+
+    try:
+        async for chunk in pipe.chunks():
+            received += len(chunk)
+            buffer += chunk
+            while len(buffer) >= UPLOAD_PART_SIZE:
+                await _save_part(bytes(buffer[:UPLOAD_PART_SIZE]))
+                del buffer[:UPLOAD_PART_SIZE]
+        if buffer:
+            await _save_part(bytes(buffer))
+    finally:
+        await session.stop()
+
+    if received != pipe.size or part != total_parts:
+        raise IOError(f"Stream ended early: received {received} of {pipe.size} bytes")
+
+    if is_big:
+        return raw.types.InputFileBig(id=file_id, parts=total_parts, name=pipe.name)
+    return raw.types.InputFile(id=file_id, parts=total_parts, name=pipe.name, md5_checksum=md5_sum.hexdigest())
+
+
+def can_stream(media_type: str, file_size: int) -> bool:
+    return media_type in STREAMABLE_TYPES and file_size > 0
+
+
+async def stream_to_chat(user_client, bot, chat_message, media_type, filename, file_size, caption, target_chat_id, max_chunks, reply_markup=None):
+    pipe = MediaPipe(filename, file_size, max_chunks)
+    pipe.start(user_client, chat_message)
+
+    try:
+        if media_type == "photo":
+            return await bot.send_photo(
+                chat_id=target_chat_id,
+                photo=pipe,
+                caption=caption or "",
+                reply_markup=reply_markup
+            )
+        return await bot.send_document(
+            chat_id=target_chat_id,
+            document=pipe,
+            file_name=filename,
+            caption=caption or "",
+            reply_markup=reply_markup
+        )
+    except Exception as e:
+        if e is pipe.error and isinstance(e, FAILOVER_ERRORS):
+            raise
+        if isinstance(e, FloodWait):
+            wait_s = int(getattr(e, "value", 0) or 0)
+            LOGGER(__name__).warning(f"FloodWait while streaming {filename}: Sleeping {get_readable_time(wait_s)}")
+            await flood_pause(bot, "send", wait_s)
+            return None
+        LOGGER(__name__).warning(f"Streaming failed for {filename}: {e}. Falling back to disk.")
+    finally:
+        await pipe.stop()
+    return None
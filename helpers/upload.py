@@ -0,0 +1,105 @@
+import os
+import math
+import asyncio
+
+from pyrogram import raw
+from pyrogram.errors import FloodWait
+from pyrogram.session import Session
+
+from helpers.ratelimit import flood_pause
+from helpers.stream import BIG_FILE_THRESHOLD, UPLOAD_PART_SIZE
+from config import PyroConf
+from logger import LOGGER
+
+PART_RETRIES = 5
+MAX_PARTIAL_UPLOADS = 64
+
+def use_parallel_upload(path) -> bool:
+    if PyroConf.UPLOAD_WORKERS <= 1 or not isinstance(path, str):
+        return False
+    try:
+        return os.path.getsize(path) > BIG_FILE_THRESHOLD
+    except OSError:
+        return False
+
+
+def get_partial_upload(client, path: str, file_size: int) -> dict:
+    state = client.partial_uploads.get(path)
+    if state is None or state["size"] != file_size:
+        state = {"file_id": client.rnd_id(), "size": file_size, "done": set()}
+        client.partial_uploads[path] = state
+        while len(client.partial_uploads) > MAX_PARTIAL_UPLOADS:
+            client.partial_uploads.pop(next(iter(client.partial_uploads)))
+    return state
+
+
+async def _save_part(client, session, file_id, part, total_parts, data):
+    attempt = 1
+    while True:
+        try:
+            await session.invoke(raw.functions.upload.SaveBigFilePart(
+                file_id=file_id,
+                file_part=part,
+                file_total_parts=total_parts,
+                bytes=data
+            ))
+            return
+        except FloodWait as e:
+            wait_s = int(getattr(e, "value", 0) or 0)
+            LOGGER(__name__).warning(f"FloodWait on upload part {part}/{total_parts}: backing off {wait_s}s")
+            await flood_pause(client, "send", wait_s)
+        except Exception as e:
+            if attempt >= PART_RETRIES:
+                raise
+            LOGGER(__name__).warning(f"Upload part {part}/{total_parts} failed ({e}), retrying {attempt}/{PART_RETRIES}")
+            await asyncio.sleep(attempt)
+            attempt += 1
+
+
+async def _upload_parts(client, session, path, state, pending, total_parts):
+    with open(path, "rb") as fp:
+        while not pending.empty():
+            part = pending.get_nowait()
+            fp.seek(part * UPLOAD_PART_SIZE)
+            data = fp.read(UPLOAD_PART_SIZE)
+            await _save_part(client, session, state["file_id"], part, total_parts, data)
+            state["done"].add(part)
+
+
+async def save_parallel(client, path: str):
+    file_size = os.path.getsize(path)
+    total_parts = math.ceil(file_size / UPLOAD_PART_SIZE)
+    state = get_partial_upload(client, path, file_size)
+
+    pending = asyncio.Queue()
+    for part in range(total_parts):
+        if part not in state["done"]:
+            pending.put_nowait(part)
+
+    if state["done"]:
+        LOGGER(__name__).info(f"Resuming upload of {os.path.basename(path)}: {pending.qsize()}/{total_parts} parts left")
+
+    async with client.save_file_semaphore:
+        sessions = [
+            Session(
+                client, await client.storage.dc_id(), await client.storage.auth_key(),
+                await client.storage.test_mode(), is_media=True
+            )
+            for _ in range(min(PyroConf.UPLOAD_WORKERS, pending.qsize()))
+        ]
+        workers = []
+        try:
+            await asyncio.gather(*(session.start() for session in sessions))
+            workers = [
+                asyncio.create_task(_upload_parts(client, session, path, state, pending, total_parts))
+                for session in sessions
+            ]
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await asyncio.gather(*(session.stop() for session in sessions), return_exceptions=True)
+
+    client.partial_uploads.pop(path, None)
+    return raw.types.InputFileBig(id=state["file_id"], parts=total_parts, name=os.path.basename(path))
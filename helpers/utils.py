@@ -18,6 +18,8 @@ from helpers.files import (
     cleanup_download,
     get_readable_time,
     get_download_path,
+    get_media_name,
+    get_media_size,
     get_readable_file_size
 )
 
@@ -25,6 +27,26 @@ from helpers.msg import (
     get_parsed_msg,
     get_file_name
 )
+from helpers.routing import (
+    copy_group,
+    record_route
+)
+from helpers.ratelimit import flood_pause
+from helpers.segments import IncompleteDownload, download_file, download_to_memory, use_memory
+from helpers.admission import MEMORY_BUDGET
+from helpers.scheduler import MEDIA_SCHEDULER
+from helpers.metadata import (
+    MEDIA_INFO_CACHE,
+    download_source_thumb,
+    get_source_media_info,
+    get_unique_id
+)
+from helpers.cache import (
+    get_media_object,
+    get_cached_file_id,
+    invalidate_cached,
+    remember_upload
+)
 from logger import LOGGER
 
 def get_progress_text(filename, file_size="Unknown Size", batch_stats=None, warning=""):
@@ -70,19 +92,24 @@ def get_progress_text(filename, file_size="Unknown Size", batch_stats=None, warn
     return text
 
 async def cmd_exec(cmd, shell=False):
-    if shell:
-        proc = await create_subprocess_shell(cmd, stdout=PIPE, stderr=PIPE)
-    else:
-        proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-    
-    try:
-        stdout, stderr = await wait_for(proc.communicate(), timeout=60)
-    except asyncio.TimeoutError:
-        proc.kill()
-        return "Timeout", "Process timed out", 1
-    except Exception as e:
-        proc.kill()
-        return "Error", str(e), 1
+    async with MEDIA_SCHEDULER.slot():
+        if shell:
+            proc = await create_subprocess_shell(cmd, stdout=PIPE, stderr=PIPE)
+        else:
+            proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+        
+        try:
+            stdout, stderr = await wait_for(proc.communicate(), timeout=60)
+        except asyncio.TimeoutError:
+            proc.kill()
+            return "Timeout", "Process timed out", 1
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+        except Exception as e:
+            proc.kill()
+            return "Error", str(e), 1
 
     try:
         stdout = stdout.decode().strip()
@@ -131,9 +158,8 @@ async def get_media_info(path):
     return 0, None, None, None, None
 
 async def get_video_thumbnail(video_file, duration, message_id=None):
-    os.makedirs("Assets", exist_ok=True)
     thumb_name = f"thumb_{message_id}.jpg" if message_id else "video_thumb.jpg"
-    output = os.path.join("Assets", thumb_name)
+    output = os.path.join(os.path.dirname(os.path.abspath(video_file)), thumb_name)
 
     if duration is None:
         duration = (await get_media_info(video_file))[0]
@@ -165,14 +191,49 @@ async def get_video_thumbnail(video_file, duration, message_id=None):
         return None
     return output
 
+def get_media_type(chat_message) -> str:
+    if chat_message.photo:
+        return "photo"
+    if chat_message.video:
+        return "video"
+    if chat_message.audio:
+        return "audio"
+    return "document"
+
+def build_input_media(media_type, media, caption, media_info=None):
+    duration, artist, title, width, height = media_info or (0, None, None, 0, 0)
+    if media_type == "photo":
+        return InputMediaPhoto(media=media, caption=caption)
+    elif media_type == "video":
+        return InputMediaVideo(media=media, caption=caption, width=width or 0, height=height or 0, duration=duration or 0)
+    elif media_type == "audio":
+        return InputMediaAudio(media=media, caption=caption, duration=duration or 0, performer=artist, title=title)
+    return InputMediaDocument(media=media, caption=caption)
+
+async def probe_media(media_path, media_type, message_id=None, chat_message=None):
+    unique_id = get_unique_id(chat_message)
+    media_info = MEDIA_INFO_CACHE.get(unique_id) if unique_id else None
+    if media_info is None:
+        media_info = get_source_media_info(chat_message) or await get_media_info(media_path)
+        if unique_id and media_info[0]:
+            MEDIA_INFO_CACHE.put(unique_id, media_info)
+
+    thumb = None
+    if media_type == "video":
+        thumb_name = f"thumb_{message_id}.jpg" if message_id else "video_thumb.jpg"
+        thumb = await download_source_thumb(chat_message, os.path.join(os.path.dirname(os.path.abspath(media_path)), thumb_name))
+        if not thumb:
+            thumb = await get_video_thumbnail(media_path, media_info[0], message_id)
+    return media_info, thumb
+
 async def send_media(
-    bot, message, media_path, media_type, caption, progress_msg=None, batch_stats=None, target_chat_id=None, reply_markup=None, message_id=None
+    bot, message, media_path, media_type, caption, progress_msg=None, batch_stats=None, target_chat_id=None, reply_markup=None, message_id=None, media_info=None, thumb=None
 ):
     if target_chat_id is None:
         target_chat_id = message.chat.id
         
     try:
-        file_size = os.path.getsize(media_path)
+        file_size = get_media_size(media_path)
     except OSError as e:
         LOGGER(__name__).error(f"File not found or inaccessible: {e}")
         return False
@@ -180,41 +241,42 @@ async def send_media(
     if not await fileSizeLimit(file_size, message, "upload"):
         return False
         
-    filename = os.path.basename(media_path)
+    filename = get_media_name(media_path)
     file_size_str = get_readable_file_size(file_size) if file_size else "Unknown Size"
 
     async def _send_once():
         if media_type == "photo":
-            await bot.send_photo(
+            return await bot.send_photo(
                 chat_id=target_chat_id,
                 photo=media_path,
                 caption=caption or "",
                 reply_markup=reply_markup
             )
         elif media_type == "video":
-            duration, _, _, width, height = await get_media_info(media_path)
+            duration, _, _, width, height = media_info or await get_media_info(media_path)
             if not duration: duration = 0
             if not width or not height: width, height = 640, 480
-            thumb = await get_video_thumbnail(media_path, duration, message_id)
-            await bot.send_video(
+            video_thumb = thumb or await get_video_thumbnail(media_path, duration, message_id)
+            sent = await bot.send_video(
                 chat_id=target_chat_id,
                 video=media_path,
                 duration=duration,
                 width=width,
                 height=height,
-                thumb=thumb,
+                thumb=video_thumb,
                 caption=caption or "",
                 supports_streaming=True,
                 reply_markup=reply_markup
             )
-            if thumb and os.path.exists(thumb):
+            if video_thumb != thumb and video_thumb and os.path.exists(video_thumb):
                 try:
-                    os.remove(thumb)
+                    os.remove(video_thumb)
                 except Exception:
                     pass
+            return sent
         elif media_type == "audio":
-            duration, artist, title, _, _ = await get_media_info(media_path)
-            await bot.send_audio(
+            duration, artist, title, _, _ = media_info or await get_media_info(media_path)
+            return await bot.send_audio(
                 chat_id=target_chat_id,
                 audio=media_path,
                 duration=duration,
@@ -224,7 +286,7 @@ async def send_media(
                 reply_markup=reply_markup
             )
         elif media_type == "document":
-            await bot.send_document(
+            return await bot.send_document(
                 chat_id=target_chat_id,
                 document=media_path,
                 caption=caption or "",
@@ -236,8 +298,7 @@ async def send_media(
 
     while retry_count <= max_retries:
         try:
-            await _send_once()
-            return True
+            return await _send_once()
         except FloodWait as e:
             wait_s = int(getattr(e, "value", 0) or 0)
             wait_msg = get_readable_time(wait_s)
@@ -247,7 +308,7 @@ async def send_media(
                     await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats, f"Rate Limited: Pausing for {wait_msg}..."))
                 except Exception:
                     pass
-            await asyncio.sleep(wait_s + 1)
+            await flood_pause(bot, "send", wait_s)
             continue
             
         except (Timeout, TimeoutError):
@@ -277,153 +338,266 @@ async def send_media(
     
     return False
 
-async def download_single_media(msg, user_client, semaphore, fetch_time=None, progress_msg=None, batch_stats=None):
+async def download_single_media(msg, sessions, fetch_time=None, progress_msg=None, batch_stats=None, in_memory=False):
     filename = get_file_name(msg.id, msg)
     
-    download_path = get_download_path(msg.id, filename)
+    media_obj = msg.document or msg.video or msg.audio or msg.photo
+    file_size = getattr(media_obj, "file_size", 0) or 0
+    if in_memory:
+        download_path = None
+        fetch = lambda client, source: download_to_memory(client, source, filename, file_size)
+    else:
+        download_path = get_download_path(msg.id, filename, file_size=file_size)
+        fetch = lambda client, source: download_file(client, source, download_path, file_size)
     
-    max_retries = 3
-    retry_count = 1
+    try:
+        max_retries = 3
+        retry_count = 1
 
-    while retry_count <= max_retries:
-        try:
-            async with semaphore:
+        while retry_count <= max_retries:
+            try:
                 if fetch_time and (time() - fetch_time) > 7200:
                     try:
-                        fresh_msg = await user_client.get_messages(chat_id=msg.chat.id, message_ids=msg.id)
+                        fresh_msg = await sessions.primary.get_messages(chat_id=msg.chat.id, message_ids=msg.id)
                         if fresh_msg and not fresh_msg.empty:
                             msg = fresh_msg
                             fetch_time = time()
                     except Exception:
                         pass
 
-                media_path = await msg.download(
-                    file_name=download_path
-                )
+                media_path, msg = await sessions.run(msg, fetch)
 
-            parsed_caption = await get_parsed_msg(
-                msg.caption or "", msg.caption_entities
-            )
+                parsed_caption = await get_parsed_msg(
+                    msg.caption or "", msg.caption_entities
+                )
 
-            if msg.photo:
-                return ("success", media_path, InputMediaPhoto(media=media_path, caption=parsed_caption))
-            elif msg.video:
-                return ("success", media_path, InputMediaVideo(media=media_path, caption=parsed_caption))
-            elif msg.document:
-                return ("success", media_path, InputMediaDocument(media=media_path, caption=parsed_caption))
-            elif msg.audio:
-                return ("success", media_path, InputMediaAudio(media=media_path, caption=parsed_caption))
+                if msg.photo or msg.video or msg.document or msg.audio:
+                    return ("success", media_path, build_input_media(get_media_type(msg), media_path, parsed_caption, get_source_media_info(msg)))
 
-        except FloodWait as e:
-            wait_s = int(getattr(e, "value", 0) or 0)
-            wait_msg = get_readable_time(wait_s)
-            LOGGER(__name__).warning(f"FloodWait downloading: Sleeping {wait_msg}")
+            except FloodWait as e:
+                wait_s = int(getattr(e, "value", 0) or 0)
+                wait_msg = get_readable_time(wait_s)
+                LOGGER(__name__).warning(f"FloodWait downloading: Sleeping {wait_msg}")
             
-            if progress_msg:
-                media_obj = msg.document or msg.video or msg.audio or msg.photo or msg.animation or msg.voice or msg.video_note or msg.sticker
-                pre_file_size = getattr(media_obj, "file_size", 0) if media_obj else 0
-                file_size_str = get_readable_file_size(pre_file_size)
+                if progress_msg:
+                    media_obj = msg.document or msg.video or msg.audio or msg.photo or msg.animation or msg.voice or msg.video_note or msg.sticker
+                    pre_file_size = getattr(media_obj, "file_size", 0) if media_obj else 0
+                    file_size_str = get_readable_file_size(pre_file_size)
+                    try:
+                        await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats, f"Rate Limited: Pausing for {wait_msg}..."))
+                    except Exception:
+                        pass
+                await sessions.wait_any()
+                continue
+            except IncompleteDownload as e:
+                LOGGER(__name__).warning(f"Download Incomplete: {filename} ({e}). Refetching message to resume...")
                 try:
-                    await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats, f"Rate Limited: Pausing for {wait_msg}..."))
+                    fresh_msg = await sessions.primary.get_messages(chat_id=msg.chat.id, message_ids=msg.id)
+                    if fresh_msg and not fresh_msg.empty:
+                        msg = fresh_msg
                 except Exception:
                     pass
-            await asyncio.sleep(wait_s + 1)
-            continue
-        except Exception as e:
-            LOGGER(__name__).info(f"Error downloading: {e} (Attempt {retry_count})")
-            if retry_count < max_retries:
-                await asyncio.sleep(2)
-                retry_count += 1
+                if not e.progressed:
+                    retry_count += 1
                 continue
-            return ("error", None, None)
-
+            except Exception as e:
+                LOGGER(__name__).info(f"Error downloading: {e} (Attempt {retry_count})")
+                if retry_count < max_retries:
+                    await asyncio.sleep(2)
+                    retry_count += 1
+                    continue
+                if download_path:
+                    cleanup_download(download_path)
+                return ("error", None, None)
+    except asyncio.CancelledError:
+        if download_path:
+            cleanup_download(download_path)
+        raise
+
+    if download_path:
+        cleanup_download(download_path)
     return ("skip", None, None)
 
-async def processMediaGroup(chat_message, user_client, bot, message, semaphore, progress_msg=None, batch_stats=None, target_chat_id=None):
-    if target_chat_id is None:
-        target_chat_id = message.chat.id
-        
-    media_group_messages = await chat_message.get_media_group()
-    valid_media = []
-    temp_paths = []
-    invalid_paths = []
+async def resolve_group_item(msg, sessions, bot, fetch_time=None, progress_msg=None, batch_stats=None, in_memory=False):
+    cached = get_cached_file_id(msg, bot)
+    if cached:
+        file_id, media_type = cached
+        parsed_caption = await get_parsed_msg(msg.caption or "", msg.caption_entities)
+        return ("cached", None, build_input_media(media_type, file_id, parsed_caption))
 
-    group_fetch_time = time()
+    result = await download_single_media(msg, sessions, fetch_time, progress_msg, batch_stats, in_memory)
+    status, media_path, _ = result
+    if status == "success" and media_path:
+        try:
+            await bot.presave_file(media_path)
+        except asyncio.CancelledError:
+            cleanup_download(media_path)
+            raise
+        except Exception as e:
+            LOGGER(__name__).warning(f"Early upload failed for {get_media_name(media_path)}, sending with the group: {e}")
+    return result
+
+async def download_media_group(chat_message, sessions, bot, budget, progress_msg=None, batch_stats=None, target_chat_id=None, group_messages=None, fetch_time=None, urgent=None):
+    media_group_messages = group_messages or await chat_message.get_media_group()
+    group = {
+        "copied": False,
+        "valid_media": [],
+        "valid_sources": [],
+        "cached_sources": [],
+        "temp_paths": [],
+        "invalid_paths": [],
+        "budget": budget,
+        "reserved": 0,
+        "memory_reserved": 0,
+        "uploader": bot,
+    }
+
+    if await copy_group(bot, chat_message, media_group_messages, target_chat_id):
+        LOGGER(__name__).info(f"Copied media group with {len(media_group_messages)} items server-side")
+        group["copied"] = True
+        return group
+    record_route("transferred")
+
+    group_fetch_time = fetch_time if group_messages and fetch_time else time()
     LOGGER(__name__).info(
         f"Downloading media group with {len(media_group_messages)} items..."
     )
 
-    download_tasks = []
-    for msg in media_group_messages:
-        if msg.photo or msg.video or msg.document or msg.audio:
-            download_tasks.append(download_single_media(msg, user_client, semaphore, group_fetch_time, progress_msg, batch_stats))
-
-    results = await asyncio.gather(*download_tasks, return_exceptions=True)
+    group_items = [
+        msg for msg in media_group_messages
+        if msg.photo or msg.video or msg.document or msg.audio
+    ]
+    memory_items = set()
+    disk_bytes = 0
+    for msg in group_items:
+        if get_cached_file_id(msg, bot):
+            continue
+        file_size = getattr(get_media_object(msg), "file_size", 0) or 0
+        if use_memory(get_media_type(msg), file_size) and MEMORY_BUDGET.try_acquire(file_size):
+            group["memory_reserved"] += file_size
+            memory_items.add(msg.id)
+        else:
+            disk_bytes += file_size
+    try:
+        group["reserved"] = await budget.acquire(disk_bytes, urgent)
+    except BaseException:
+        cleanup_media_group(group)
+        raise
+
+    download_tasks = [
+        asyncio.create_task(resolve_group_item(
+            msg, sessions, bot, group_fetch_time, progress_msg, batch_stats, msg.id in memory_items
+        ))
+        for msg in group_items
+    ]
 
-    for result in results:
+    try:
+        results = await asyncio.gather(*download_tasks, return_exceptions=True)
+    except BaseException:
+        for task in download_tasks:
+            task.cancel()
+        await asyncio.gather(*download_tasks, return_exceptions=True)
+        for msg, task in zip(group_items, download_tasks):
+            if not task.cancelled() and task.exception() is None:
+                add_group_result(group, msg, task.result())
+        cleanup_media_group(group)
+        raise
+
+    for msg, result in zip(group_items, results):
         if isinstance(result, Exception):
             LOGGER(__name__).error(f"Download task failed: {result}")
             continue
+        add_group_result(group, msg, result)
+
+    LOGGER(__name__).info(f"Valid media count: {len(group['valid_media'])}")
+    return group
+
+def add_group_result(group, msg, result) -> None:
+    status, media_path, media_obj = result
+    if status == "cached" and media_obj:
+        group["valid_media"].append(media_obj)
+        group["valid_sources"].append(msg)
+        group["cached_sources"].append(msg)
+    elif status == "success" and media_path and media_obj:
+        group["temp_paths"].append(media_path)
+        group["valid_media"].append(media_obj)
+        group["valid_sources"].append(msg)
+    elif status == "error" and media_path:
+        group["invalid_paths"].append(media_path)
+
+def cleanup_media_group(group) -> None:
+    if group["reserved"]:
+        group["budget"].release(group["reserved"])
+        group["reserved"] = 0
+    if group["memory_reserved"]:
+        MEMORY_BUDGET.release(group["memory_reserved"])
+        group["memory_reserved"] = 0
+    for path in group["temp_paths"] + group["invalid_paths"]:
+        group["uploader"].forget_presaved(path)
+        cleanup_download(path)
+    group["temp_paths"].clear()
+    group["invalid_paths"].clear()
 
-        status, media_path, media_obj = result
-        if status == "success" and media_path and media_obj:
-            temp_paths.append(media_path)
-            valid_media.append(media_obj)
-        elif status == "error" and media_path:
-            invalid_paths.append(media_path)
+async def upload_media_group(bot, message, group, progress_msg=None, batch_stats=None, target_chat_id=None):
+    if target_chat_id is None:
+        target_chat_id = message.chat.id
 
-    LOGGER(__name__).info(f"Valid media count: {len(valid_media)}")
+    if group["copied"]:
+        return True
 
-    if valid_media:
-        sent_success = False
-        max_retries = 3
-        retry_count = 1
+    valid_media = group["valid_media"]
+    if not valid_media:
+        cleanup_media_group(group)
+        return False
 
-        while retry_count <= max_retries:
-            try:
-                await bot.send_media_group(chat_id=target_chat_id, media=valid_media)
-                sent_success = True
-                break
-            except FloodWait as e:
-                wait_s = int(getattr(e, "value", 0) or 0)
-                wait_msg = get_readable_time(wait_s)
-                LOGGER(__name__).warning(f"FloodWait sending group: Sleeping {wait_msg}")
-                if progress_msg:
-                    try:
-                        await progress_msg.edit(get_progress_text("Media Group", "Multiple Files", batch_stats, f"Rate Limited: Pausing for {wait_msg}..."))
-                    except Exception:
-                        pass
-                await asyncio.sleep(wait_s + 1)
+    sent_success = False
+    max_retries = 3
+    retry_count = 1
+
+    while retry_count <= max_retries:
+        try:
+            sent_messages = await bot.send_media_group(chat_id=target_chat_id, media=valid_media)
+            sent_success = True
+            for source_msg, sent_msg in zip(group["valid_sources"], sent_messages):
+                remember_upload(source_msg, sent_msg, get_media_type(source_msg))
+            break
+        except FloodWait as e:
+            wait_s = int(getattr(e, "value", 0) or 0)
+            wait_msg = get_readable_time(wait_s)
+            LOGGER(__name__).warning(f"FloodWait sending group: Sleeping {wait_msg}")
+            if progress_msg:
+                try:
+                    await progress_msg.edit(get_progress_text("Media Group", "Multiple Files", batch_stats, f"Rate Limited: Pausing for {wait_msg}..."))
+                except Exception:
+                    pass
+            await flood_pause(bot, "send", wait_s)
+            continue
+        except Exception as e:
+            LOGGER(__name__).error(f"Media group send failed: {e}")
+            if retry_count < max_retries:
+                retry_count += 1
+                await asyncio.sleep(2)
                 continue
+            break
+
+    if not sent_success:
+        for source_msg in group["cached_sources"]:
+            invalidate_cached(source_msg, bot)
+        await message.reply(
+            "**❌ Failed to send media group, trying individual uploads**"
+        )
+        for media in valid_media:
+            try:
+                if isinstance(media, InputMediaPhoto):
+                    await bot.send_photo(chat_id=target_chat_id, photo=media.media, caption=media.caption)
+                elif isinstance(media, InputMediaVideo):
+                    await bot.send_video(chat_id=target_chat_id, video=media.media, caption=media.caption)
+                elif isinstance(media, InputMediaDocument):
+                    await bot.send_document(chat_id=target_chat_id, document=media.media, caption=media.caption)
+                elif isinstance(media, InputMediaAudio):
+                    await bot.send_audio(chat_id=target_chat_id, audio=media.media, caption=media.caption)
             except Exception as e:
-                LOGGER(__name__).error(f"Media group send failed: {e}")
-                if retry_count < max_retries:
-                    retry_count += 1
-                    await asyncio.sleep(2)
-                    continue
-                break
-        
-        if not sent_success:
-            await message.reply(
-                "**❌ Failed to send media group, trying individual uploads**"
-            )
-            for media in valid_media:
-                try:
-                    if isinstance(media, InputMediaPhoto):
-                        await bot.send_photo(chat_id=target_chat_id, photo=media.media, caption=media.caption)
-                    elif isinstance(media, InputMediaVideo):
-                        await bot.send_video(chat_id=target_chat_id, video=media.media, caption=media.caption)
-                    elif isinstance(media, InputMediaDocument):
-                        await bot.send_document(chat_id=target_chat_id, document=media.media, caption=media.caption)
-                    elif isinstance(media, InputMediaAudio):
-                        await bot.send_audio(chat_id=target_chat_id, audio=media.media, caption=media.caption)
-                except Exception as e:
-                    await message.reply(f"Failed to upload individual media: {e}")
-
-        for path in temp_paths + invalid_paths:
-            cleanup_download(path)
-        return True
+                await message.reply(f"Failed to upload individual media: {e}")
 
-    for path in invalid_paths:
-        cleanup_download(path)
-    return False
\ No newline at end of file
+    cleanup_media_group(group)
+    return True
@@ -11,8 +11,12 @@ from pyrogram.errors import PeerIdInvalid, BadRequest, FloodWait, FileReferenceE
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
 from helpers.utils import (
-    processMediaGroup,
+    download_media_group,
+    upload_media_group,
+    cleanup_media_group,
+    probe_media,
     send_media,
+    get_media_type,
     get_progress_text
 )
 
@@ -21,6 +25,7 @@ from helpers.files import (
     fileSizeLimit,
     get_readable_file_size,
     get_readable_time,
+    get_media_size,
     cleanup_download
 )
 
@@ -32,10 +37,47 @@ from helpers.msg import (
     extract_youtube_keyboard
 )
 
+from helpers.routing import (
+    ROUTE_STATS,
+    can_copy,
+    copy_post,
+    record_route
+)
+
+from helpers.cache import (
+    FILE_CACHE,
+    get_cached_file_id,
+    get_media_object,
+    remember_upload,
+    resend_from_cache
+)
+
+from helpers.stream import (
+    can_stream,
+    stream_to_chat
+)
+
+from helpers.journal import (
+    JOURNAL,
+    job_from_batch,
+    parse_chat_refs
+)
+
+from helpers.client import ManagedClient
+from helpers.pool import FAILOVER_ERRORS, ClientPool, SessionPool
+from helpers.segments import IncompleteDownload, download_file, download_to_memory, use_memory
+from helpers.pipeline import Pipeline, Stage
+from helpers.admission import DOWNLOAD_BUDGET, MEMORY_BUDGET
+from helpers.progress import ProgressEditor
+from helpers.prefetch import BATCH_FILTERS, plan_windows, prefetch_messages
+from helpers.flight import POST_FLIGHTS
+from helpers.ordering import ReorderBuffer
+from helpers.scheduler import MEDIA_PRIORITY, MEDIA_SCHEDULER, PRIORITY_INTERACTIVE
+
 from config import PyroConf
 from logger import LOGGER
 
-bot = Client(
+bot = ManagedClient(
     "media_bot",
     api_id=PyroConf.API_ID,
     api_hash=PyroConf.API_HASH,
@@ -46,27 +88,85 @@ bot = Client(
     sleep_threshold=60,
 )
 
-user = Client(
+user = ManagedClient(
     "user_session",
     workers=100,
     session_string=PyroConf.SESSION_STRING,
-    max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_DOWNLOADS,
+    max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_DOWNLOADS * PyroConf.DOWNLOAD_SEGMENTS,
     sleep_threshold=60,
+    warm_peers=True,
 )
 
+extra_users = [
+    ManagedClient(
+        f"user_session_{index}",
+        workers=100,
+        session_string=session_string,
+        max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_DOWNLOADS * PyroConf.DOWNLOAD_SEGMENTS,
+        sleep_threshold=60,
+        no_updates=True,
+        warm_peers=True,
+    )
+    for index, session_string in enumerate(PyroConf.SESSION_STRINGS, start=1)
+]
+
+helper_bots = [
+    ManagedClient(
+        f"upload_bot_{index}",
+        api_id=PyroConf.API_ID,
+        api_hash=PyroConf.API_HASH,
+        bot_token=bot_token,
+        workers=100,
+        parse_mode=ParseMode.MARKDOWN,
+        max_concurrent_transmissions=PyroConf.MAX_CONCURRENT_UPLOADS,
+        sleep_threshold=60,
+        no_updates=True,
+    )
+    for index, bot_token in enumerate(PyroConf.HELPER_BOT_TOKENS, start=1)
+]
+
+USER_POOL = SessionPool([user, *extra_users], PyroConf.MAX_CONCURRENT_DOWNLOADS)
+BOT_POOL = ClientPool([bot], PyroConf.MAX_CONCURRENT_UPLOADS, "send")
+HELPER_POOL = ClientPool(helper_bots, PyroConf.MAX_CONCURRENT_UPLOADS, "send") if helper_bots else None
+
 RUNNING_TASKS = set()
-download_semaphore = None
-upload_semaphore = None
 BATCH_JOBS = {}
 WAITING_FOR_CHANNEL = {}
+ACTIVE_BATCHES = set()
+
+def get_upload_pool(post: dict) -> ClientPool:
+    if HELPER_POOL and str(post["target_chat_id"]) != str(post["message"].chat.id):
+        return HELPER_POOL
+    return BOT_POOL
+
+def get_targets(target_chat_id) -> list:
+    if isinstance(target_chat_id, (list, tuple)):
+        return list(target_chat_id)
+    return [target_chat_id]
+
+def pinned_uploader(post: dict):
+    return post["uploader"] if post["extra_targets"] or post["order"] is not None else None
+
+async def wait_turn(post: dict):
+    if post["order"] is not None:
+        await post["order"].wait_turn(post["seq"])
+
+def holds_turn(post: dict) -> bool:
+    return post["order"] is not None and post["seq"] <= post["order"].next_seq
 
-def get_semaphores():
-    global download_semaphore, upload_semaphore
-    if download_semaphore is None:
-        download_semaphore = asyncio.Semaphore(PyroConf.MAX_CONCURRENT_DOWNLOADS)
-    if upload_semaphore is None:
-        upload_semaphore = asyncio.Semaphore(PyroConf.MAX_CONCURRENT_UPLOADS)
-    return download_semaphore, upload_semaphore
+def pick_uploader(post: dict):
+    candidates = get_upload_pool(post).candidates(post["target_chat_id"])
+    for member in candidates:
+        if get_cached_file_id(post["chat_message"], member.client):
+            return member
+    return candidates[0] if candidates else None
+
+def get_post_key(post_url: str):
+    try:
+        chat_id, message_id = getChatMsgID(post_url)
+    except Exception:
+        return None
+    return str(chat_id).lower(), message_id
 
 def track_task(coro):
     task = asyncio.create_task(coro)
@@ -93,277 +193,557 @@ async def help_command(_, message: Message):
     help_text = (
         "**💡Bot Help & Commands**\n\n"
         "**Single Posts**\n"
-        "> Paste any Telegram link or use `/dl <link>`.\n\n"
+        "> Paste any Telegram link or use `/dl <link>`.\n"
+        "> Add channel post links after it to send to several channels:\n"
+        "> `/dl <link> <channel_link> <channel_link>`\n\n"
         "**Batch Mode**\n"
         "> `/batch <start_url> <end_url> [filter]`\n"
         ">  Filters: video, doc, photo, audio\n"
         "> Example: `/batch .../10 .../20 video`\n\n"
         "**Controls**\n"
-        "> `/stop` | `/stats` | `/logs`\n\n"
+        "> `/stop` | `/resume` | `/stats` | `/logs`\n\n"
         "**Requirements**\n"
         "> 🔒 User session must be in the chat."
     )
     await message.reply(help_text, disable_web_page_preview=True)
 
-async def handle_download(bot: Client, message: Message, post_url: str, pre_fetched_msg: Message = None, fetch_time: float = None, progress_msg: Message = None, batch_stats: dict = None, target_chat_id: int | str = None):
-    if target_chat_id is None:
-        target_chat_id = message.chat.id
-        
-    task_start_time = time()
+def new_post(bot: Client, message: Message, post_url: str, chat_message: Message = None, fetch_time: float = None, progress_msg: Message = None, batch_stats: dict = None, target_chat_id: int | str | list = None) -> dict:
     if "?" in post_url:
         post_url = post_url.split("?", 1)[0]
+    targets = get_targets(target_chat_id if target_chat_id is not None else message.chat.id)
+
+    return {
+        "bot": bot,
+        "message": message,
+        "post_url": post_url,
+        "chat_message": chat_message,
+        "fetch_time": fetch_time,
+        "progress_msg": progress_msg,
+        "batch_stats": batch_stats,
+        "target_chat_id": targets[0],
+        "extra_targets": targets[1:],
+        "kind": None,
+        "media_path": None,
+        "media_info": None,
+        "thumb": None,
+        "group": None,
+        "album": None,
+        "partial_path": None,
+        "reserved": 0,
+        "memory_reserved": 0,
+        "uploader": None,
+        "order": None,
+        "seq": None,
+        "flight": None,
+        "borrowed": False,
+        "status": "pending",
+        "batch_id": None,
+    }
 
-    media_path = None 
-    dl_sem, up_sem = get_semaphores()
-
+def journal_post(post: dict, state: str):
+    if post["batch_id"] is None:
+        return
     try:
-        if pre_fetched_msg:
-            chat_message = pre_fetched_msg
-            message_id = chat_message.id
-        else:
-            chat_id, message_id = getChatMsgID(post_url)
-            chat_message = await user.get_messages(chat_id=chat_id, message_ids=message_id)
-
-        if not chat_message or chat_message.empty:
-             await message.reply("**❌ Message not found or inaccessible.**")
-             return
-
-        if chat_message.document or chat_message.video or chat_message.audio:
-            file_size = (
-                chat_message.document.file_size
-                if chat_message.document
-                else chat_message.video.file_size
-                if chat_message.video
-                else chat_message.audio.file_size
-            )
-            if not await fileSizeLimit(
-                file_size, message, "download", user.me.is_premium
-            ):
-                return
+        JOURNAL.mark(post["batch_id"], post["chat_message"].id, state)
+    except Exception as e:
+        LOGGER(__name__).warning(f"Failed to journal {post['post_url']} as {state}: {e}")
 
-        parsed_caption = await get_parsed_msg(
-            chat_message.caption or "", chat_message.caption_entities
+async def mark_post_progress(post: dict, filename: str, file_size_str: str):
+    progress_msg = post["progress_msg"]
+    batch_stats = post["batch_stats"]
+    if progress_msg and batch_stats:
+        batch_stats["processed"] += 1
+        try:
+            await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats))
+        except Exception:
+            pass
+    elif not progress_msg:
+        post["progress_msg"] = ProgressEditor(
+            await post["message"].reply(get_progress_text(filename, file_size_str)), PyroConf.PROGRESS_INTERVAL
+        )
+
+async def fail_post(post: dict, text: str):
+    post["status"] = "failed"
+    if post["progress_msg"]:
+        try:
+            await post["progress_msg"].edit(text)
+            await asyncio.sleep(2)
+        except Exception:
+            pass
+
+async def resend_post(post: dict, uploader: Client, target_chat_id: int | str) -> bool:
+    chat_message = post["chat_message"]
+
+    if post["kind"] == "text":
+        parsed_text = await get_parsed_msg(chat_message.text or "", chat_message.entities)
+        await uploader.send_message(
+            chat_id=target_chat_id,
+            text=clean_caption(parsed_text),
+            reply_markup=post["keyboard"],
+            disable_web_page_preview=True
         )
-        parsed_caption = clean_caption(parsed_caption)
-        safe_keyboard = extract_youtube_keyboard(chat_message.reply_markup)
-
-        has_downloadable_media = (
-            chat_message.document or chat_message.video or 
-            chat_message.audio or chat_message.photo or 
-            chat_message.animation or chat_message.voice or 
-            chat_message.video_note or chat_message.sticker
+        return True
+
+    if post["kind"] == "group":
+        group_messages = post["album"] or (post["group"]["valid_sources"] if post["group"] else None)
+        group = await download_media_group(
+            chat_message, USER_POOL, uploader, DOWNLOAD_BUDGET, target_chat_id=target_chat_id,
+            group_messages=group_messages or None, fetch_time=post["fetch_time"],
+            urgent=lambda: holds_turn(post)
         )
+        try:
+            return await upload_media_group(uploader, post["message"], group, target_chat_id=target_chat_id)
+        finally:
+            cleanup_media_group(group)
+
+    if await resend_from_cache(uploader, chat_message, target_chat_id, post["caption"], post["keyboard"]):
+        return True
+    return await copy_post(uploader, chat_message, target_chat_id, post["caption"], post["keyboard"])
+
+async def fanout_post(post: dict):
+    upload_pool = get_upload_pool(post)
+    failed_targets = []
+    for target_chat_id in post["extra_targets"]:
+        try:
+            async with upload_pool.lease(target_chat_id, post["uploader"]) as uploader:
+                sent = await resend_post(post, uploader, target_chat_id)
+        except Exception as e:
+            LOGGER(__name__).error(f"Failed to send {post['post_url']} to {target_chat_id}: {e}")
+            sent = False
+        if not sent:
+            LOGGER(__name__).warning(f"Could not resend {post['post_url']} to {target_chat_id}")
+            failed_targets.append(target_chat_id)
 
-        if chat_message.media_group_id:
+    if failed_targets:
+        try:
+            await post["message"].reply(
+                f"**⚠️ {post['post_url']} was not sent to:** "
+                + ", ".join(f"`{target_chat_id}`" for target_chat_id in failed_targets)
+            )
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to report fan-out errors for {post['post_url']}: {e}")
+
+async def finish_post(post: dict, route: str = None):
+    post["status"] = "sent"
+    if post["flight"]:
+        post["flight"].publish(post)
+    if post["extra_targets"]:
+        await fanout_post(post)
+    if not post["batch_stats"] and post["progress_msg"]:
+        try:
+            await post["progress_msg"].delete()
+        except Exception:
+            pass
+    if route:
+        LOGGER(__name__).info(f"Finished Processing via {route}: {post['post_url']}")
+    else:
+        LOGGER(__name__).info(f"Finished Processing: {post['post_url']}")
+
+def release_post(post: dict):
+    if post["borrowed"]:
+        post["media_path"] = post["thumb"] = None
+    if post["reserved"]:
+        DOWNLOAD_BUDGET.release(post["reserved"])
+        post["reserved"] = 0
+    if post["memory_reserved"]:
+        MEMORY_BUDGET.release(post["memory_reserved"])
+        post["memory_reserved"] = 0
+    if post["partial_path"]:
+        cleanup_download(post["partial_path"])
+        post["partial_path"] = None
+    if post["media_path"]:
+        if post["uploader"]:
+            post["uploader"].client.forget_presaved(post["media_path"])
+        cleanup_download(post["media_path"])
+        post["media_path"] = None
+    if post["thumb"]:
+        cleanup_download(post["thumb"])
+        post["thumb"] = None
+    if post["group"]:
+        cleanup_media_group(post["group"])
+    if post["order"] is not None:
+        post["order"].complete(post["seq"])
+        post["order"] = None
+        DOWNLOAD_BUDGET.wake()
+
+async def report_post_error(post: dict, error: Exception):
+    post["status"] = "failed"
+    if isinstance(error, (PeerIdInvalid, BadRequest, KeyError)):
+        await post["message"].reply("**Make sure the user client is part of the chat.**")
+    elif isinstance(error, FloodWait):
+        wait_s = int(getattr(error, "value", 0) or 0)
+        LOGGER(__name__).warning(f"FloodWait in handle_download: {wait_s}s")
+        if wait_s > 0:
+            await asyncio.sleep(wait_s + 1)
+    else:
+        await post["message"].reply(f"**❌ {str(error)}**")
+        LOGGER(__name__).error(f"Error handling {post['post_url']}: {error}")
+
+async def prepare_post(post: dict):
+    message = post["message"]
+    chat_message = post["chat_message"]
+
+    if not chat_message:
+        chat_id, message_id = getChatMsgID(post["post_url"])
+        chat_message = await user.get_messages(chat_id=chat_id, message_ids=message_id)
+        post["chat_message"] = chat_message
+
+    if not chat_message or chat_message.empty:
+        post["status"] = "failed"
+        await message.reply("**❌ Message not found or inaccessible.**")
+        return None
+
+    if chat_message.document or chat_message.video or chat_message.audio:
+        file_size = (
+            chat_message.document.file_size
+            if chat_message.document
+            else chat_message.video.file_size
+            if chat_message.video
+            else chat_message.audio.file_size
+        )
+        if not await fileSizeLimit(
+            file_size, message, "download", user.me.is_premium
+        ):
+            post["status"] = "failed"
+            return None
+
+    parsed_caption = await get_parsed_msg(
+        chat_message.caption or "", chat_message.caption_entities
+    )
+    post["caption"] = clean_caption(parsed_caption)
+    post["keyboard"] = extract_youtube_keyboard(chat_message.reply_markup)
+
+    media_obj = get_media_object(chat_message)
+    post["uploader"] = pick_uploader(post)
+    uploader = post["uploader"].client
+
+    if chat_message.media_group_id:
+        post["kind"] = "group"
+        if can_copy(chat_message, uploader):
+            await wait_turn(post)
+        await mark_post_progress(post, "Media Group", "Multiple Files")
+        return post
+
+    elif media_obj:
+        post["kind"] = "media"
+        post["filename"] = get_file_name(chat_message.id, chat_message)
+        post["file_size"] = getattr(media_obj, "file_size", 0) or 0
+        post["media_type"] = get_media_type(chat_message)
+
+        if get_cached_file_id(chat_message, uploader) or can_copy(chat_message, uploader):
+            await wait_turn(post)
+
+        route = None
+        if await resend_from_cache(uploader, chat_message, post["target_chat_id"], post["caption"], post["keyboard"]):
+            route = "File Cache"
+            record_route("cached")
+        elif await copy_post(uploader, chat_message, post["target_chat_id"], post["caption"], post["keyboard"]):
+            route = "Server Copy"
+
+        if route:
+            progress_msg = post["progress_msg"]
+            batch_stats = post["batch_stats"]
             if progress_msg and batch_stats:
                 batch_stats["processed"] += 1
                 try:
-                    await progress_msg.edit(get_progress_text("Media Group", "Multiple Files", batch_stats))
+                    await progress_msg.edit(get_progress_text(post["filename"], route, batch_stats))
                 except Exception:
                     pass
-            elif not progress_msg:
-                progress_msg = await message.reply(get_progress_text("Media Group", "Multiple Files"))
+            await finish_post(post, route)
+            return None
 
-            if not await processMediaGroup(chat_message, user, bot, message, dl_sem, progress_msg, batch_stats, target_chat_id):
-                if progress_msg:
-                    try:
-                        await progress_msg.edit("❌ **Failed to process Media Group**")
-                        await asyncio.sleep(2)
-                    except Exception:
-                        pass
-            
-            if not batch_stats and progress_msg:
-                try:
-                    await progress_msg.delete()
-                except Exception:
-                    pass
-            return
+        record_route("transferred")
+        return post
 
-        elif has_downloadable_media:
-            filename = get_file_name(message_id, chat_message)
-            download_path = get_download_path(message_id, filename)
+    elif chat_message.text:
+        post["kind"] = "text"
+        return post
 
-            media_obj = (
-                chat_message.document or chat_message.video or 
-                chat_message.audio or chat_message.photo or 
-                chat_message.animation or chat_message.voice or 
-                chat_message.video_note or chat_message.sticker
-            )
-            pre_file_size = getattr(media_obj, "file_size", 0) if media_obj else 0
-            file_size_str = get_readable_file_size(pre_file_size)
-            
-            LOGGER(__name__).info(f"Downloading media: {filename} (Size: {file_size_str})")
+    post["status"] = "skipped"
+    if post["batch_stats"]:
+        post["batch_stats"]["processed"] += 1
+    await message.reply("**No downloadable media or text found in the post URL.**")
+    return None
 
-            async with dl_sem:
-                if pre_fetched_msg and fetch_time and (time() - fetch_time) > 7200:
-                    try:
-                        chat_id, msg_id = getChatMsgID(post_url)
-                        fresh_msg = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
-                        if fresh_msg and not fresh_msg.empty:
-                            chat_message = fresh_msg
-                            fetch_time = time()
-                    except Exception as e:
-                        LOGGER(__name__).warning(f"Failed to refresh stale reference for {filename}: {e}")
-
-                if progress_msg and batch_stats:
-                    batch_stats["processed"] += 1
-                    try:
-                        await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats))
-                    except Exception:
-                        pass
-                elif not progress_msg:
-                    progress_msg = await message.reply(get_progress_text(filename, file_size_str))
-                
-                max_retries = 3
-                retry_count = 1
-                
-                while retry_count <= max_retries:
-                    try:
-                        media_path = await chat_message.download(
-                            file_name=download_path
-                        )
-                        
-                        if media_path and os.path.exists(media_path):
-                            actual_size = os.path.getsize(media_path)
-
-                            if pre_file_size > 0 and actual_size < pre_file_size:
-                                LOGGER(__name__).warning(f"Download Incomplete: {post_url}. Refetching message...")
-                                
-                                os.remove(media_path)
-                                media_path = None
-                                
-                                try:
-                                    chat_id, msg_id = getChatMsgID(post_url)
-                                    chat_message = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
-                                except Exception as refetch_err:
-                                    LOGGER(__name__).error(f"Failed to refetch message for {filename}: {refetch_err}")
-                                
-                                retry_count += 1
-                                continue
-
-                        break
-                    except FloodWait as e:
-                        wait_s = int(getattr(e, "value", 0) or 0)
-                        wait_msg = get_readable_time(wait_s)
-                        LOGGER(__name__).warning(f"FloodWait while downloading media: {wait_s}s")
-                        if progress_msg:
-                            try:
-                                await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats, f"⏳ Rate Limited: Pausing for {wait_msg}..."))
-                            except Exception:
-                                pass
-                        await asyncio.sleep(wait_s + 1)
-                        continue 
-                    except FileReferenceExpired:
-                        LOGGER(__name__).warning(f"File reference expired for {filename}. Refetching message...")
-                        try:
-                            chat_id, msg_id = getChatMsgID(post_url)
-                            chat_message = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
-                        except Exception as refetch_err:
-                            LOGGER(__name__).error(f"Failed to refetch message for {filename}: {refetch_err}")
-                        
-                        retry_count += 1
-                        continue
-                    except Exception as e:
-                        LOGGER(__name__).error(f"Download Error: {e}")
-                        if retry_count < max_retries:
-                             await asyncio.sleep(2)
-                             retry_count += 1
-                             continue
-                        break
-
-            if not media_path or not os.path.exists(media_path):
-                if progress_msg:
-                    try:
-                        await progress_msg.edit(f"❌ **Failed to process {filename}**")
-                        await asyncio.sleep(2)
-                    except Exception:
-                        pass
-                return
-
-            file_size = os.path.getsize(media_path)
-            if file_size == 0:
-                if progress_msg:
-                    try:
-                        await progress_msg.edit(f"❌ **Failed to process {filename}**")
-                        await asyncio.sleep(2)
-                    except Exception:
-                        pass
-                return
-            
-            media_type = (
-                "photo"
-                if chat_message.photo
-                else "video"
-                if chat_message.video
-                else "audio"
-                if chat_message.audio
-                else "document"
-            )
-            
-            async with up_sem:
-                upload_success = await send_media(
-                    bot,
-                    message,
-                    media_path,
-                    media_type,
-                    parsed_caption,
-                    progress_msg,
-                    batch_stats,
-                    target_chat_id,
-                    reply_markup=safe_keyboard,
-                    message_id=message_id
+async def download_post(post: dict):
+    chat_message = post["chat_message"]
+
+    if post["kind"] == "group":
+        post["group"] = await download_media_group(
+            chat_message, USER_POOL, post["uploader"].client, DOWNLOAD_BUDGET, post["progress_msg"], post["batch_stats"], post["target_chat_id"],
+            group_messages=post["album"], fetch_time=post["fetch_time"], urgent=lambda: holds_turn(post)
+        )
+        journal_post(post, "downloaded")
+        return post
+
+    post_url = post["post_url"]
+    filename = post["filename"]
+    pre_file_size = post["file_size"]
+    media_type = post["media_type"]
+    file_size_str = get_readable_file_size(pre_file_size)
+    media_path = None
+
+    LOGGER(__name__).info(f"Downloading media: {filename} (Size: {file_size_str})")
+
+    if use_memory(media_type, pre_file_size):
+        post["memory_reserved"] = MEMORY_BUDGET.try_acquire(pre_file_size)
+    if post["memory_reserved"]:
+        fetch = lambda client, source: download_to_memory(client, source, filename, pre_file_size)
+    else:
+        download_path = get_download_path(chat_message.id, filename, file_size=pre_file_size)
+        post["partial_path"] = download_path
+        post["reserved"] = await DOWNLOAD_BUDGET.acquire(pre_file_size, lambda: holds_turn(post))
+        fetch = lambda client, source: download_file(client, source, download_path, pre_file_size)
+    fetch_time = post["fetch_time"]
+    if fetch_time and (time() - fetch_time) > 7200:
+        try:
+            chat_id, msg_id = getChatMsgID(post_url)
+            fresh_msg = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
+            if fresh_msg and not fresh_msg.empty:
+                chat_message = fresh_msg
+                post["fetch_time"] = time()
+        except Exception as e:
+            LOGGER(__name__).warning(f"Failed to refresh stale reference for {filename}: {e}")
+
+    await mark_post_progress(post, filename, file_size_str)
+    progress_msg = post["progress_msg"]
+    batch_stats = post["batch_stats"]
+
+    streamed_msg = None
+    if PyroConf.STREAM_MODE and post["order"] is None and can_stream(media_type, pre_file_size):
+        try:
+            async with get_upload_pool(post).lease(post["target_chat_id"], pinned_uploader(post)) as uploader:
+                streamed_msg, chat_message = await USER_POOL.run(
+                    chat_message,
+                    lambda client, source: stream_to_chat(
+                        client, uploader, source, media_type, filename, pre_file_size,
+                        post["caption"], post["target_chat_id"], PyroConf.STREAM_BUFFER_CHUNKS,
+                        reply_markup=post["keyboard"]
+                    )
                 )
+        except FAILOVER_ERRORS as e:
+            LOGGER(__name__).warning(f"Streaming unavailable for {filename} on every session ({type(e).__name__}). Falling back to disk.")
+    
+    max_retries = 3
+    retry_count = 1
+    
+    while not streamed_msg and retry_count <= max_retries:
+        try:
+            media_path, chat_message = await USER_POOL.run(chat_message, fetch)
+            
+            if isinstance(media_path, str) and os.path.exists(media_path):
+                actual_size = os.path.getsize(media_path)
 
-            if upload_success:
-                if not batch_stats and progress_msg:
+                if pre_file_size > 0 and actual_size < pre_file_size:
+                    LOGGER(__name__).warning(f"Download Incomplete: {post_url}. Refetching message...")
+                    
+                    os.remove(media_path)
+                    media_path = None
+                    
                     try:
-                        await progress_msg.delete()
-                    except Exception:
-                        pass
-                LOGGER(__name__).info(f"Finished Processing: {post_url}")
+                        chat_id, msg_id = getChatMsgID(post_url)
+                        chat_message = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
+                    except Exception as refetch_err:
+                        LOGGER(__name__).error(f"Failed to refetch message for {filename}: {refetch_err}")
+                    
+                    retry_count += 1
+                    continue
 
-        elif chat_message.text:
-            if batch_stats:
-                batch_stats["processed"] += 1
+            break
+        except FloodWait as e:
+            wait_s = int(getattr(e, "value", 0) or 0)
+            wait_msg = get_readable_time(wait_s)
+            LOGGER(__name__).warning(f"FloodWait while downloading media: {wait_s}s")
+            if progress_msg:
                 try:
-                    await progress_msg.edit(get_progress_text("Text Message", "N/A", batch_stats))
+                    await progress_msg.edit(get_progress_text(filename, file_size_str, batch_stats, f"⏳ Rate Limited: Pausing for {wait_msg}..."))
                 except Exception:
                     pass
+            await USER_POOL.wait_any()
+            continue 
+        except IncompleteDownload as e:
+            LOGGER(__name__).warning(f"Download Incomplete: {post_url} ({e}). Refetching message to resume...")
+            try:
+                chat_id, msg_id = getChatMsgID(post_url)
+                chat_message = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
+            except Exception as refetch_err:
+                LOGGER(__name__).error(f"Failed to refetch message for {filename}: {refetch_err}")
+
+            if not e.progressed:
+                retry_count += 1
+            continue
+        except FileReferenceExpired:
+            LOGGER(__name__).warning(f"File reference expired for {filename}. Refetching message...")
+            try:
+                chat_id, msg_id = getChatMsgID(post_url)
+                chat_message = await user.get_messages(chat_id=chat_id, message_ids=msg_id)
+            except Exception as refetch_err:
+                LOGGER(__name__).error(f"Failed to refetch message for {filename}: {refetch_err}")
             
-            parsed_text = await get_parsed_msg(chat_message.text or "", chat_message.entities)
-            parsed_text = clean_caption(parsed_text)
-            
-            await bot.send_message(
+            retry_count += 1
+            continue
+        except Exception as e:
+            LOGGER(__name__).error(f"Download Error: {e}")
+            if retry_count < max_retries:
+                 await asyncio.sleep(2)
+                 retry_count += 1
+                 continue
+            break
+
+    post["chat_message"] = chat_message
+    post["media_path"] = media_path
+    if media_path:
+        post["partial_path"] = None
+
+    if streamed_msg:
+        remember_upload(chat_message, streamed_msg, media_type)
+        await finish_post(post, "Stream")
+        return None
+
+    if not media_path or (isinstance(media_path, str) and not os.path.exists(media_path)) or get_media_size(media_path) == 0:
+        await fail_post(post, f"❌ **Failed to process {filename}**")
+        return None
+
+    journal_post(post, "downloaded")
+    return post
+
+async def probe_post(post: dict):
+    post["media_info"], post["thumb"] = await probe_media(
+        post["media_path"], post["media_type"], post["chat_message"].id, post["chat_message"]
+    )
+    return post
+
+async def upload_post(post: dict):
+    message = post["message"]
+    chat_message = post["chat_message"]
+    progress_msg = post["progress_msg"]
+    batch_stats = post["batch_stats"]
+    target_chat_id = post["target_chat_id"]
+    upload_pool = get_upload_pool(post)
+
+    if post["kind"] == "text":
+        if batch_stats:
+            batch_stats["processed"] += 1
+            try:
+                await progress_msg.edit(get_progress_text("Text Message", "N/A", batch_stats))
+            except Exception:
+                pass
+        
+        parsed_text = await get_parsed_msg(chat_message.text or "", chat_message.entities)
+        parsed_text = clean_caption(parsed_text)
+        
+        await wait_turn(post)
+        async with upload_pool.lease(target_chat_id, pinned_uploader(post)) as uploader:
+            await uploader.send_message(
                 chat_id=target_chat_id,
                 text=parsed_text, 
-                reply_markup=safe_keyboard,
+                reply_markup=post["keyboard"],
                 disable_web_page_preview=True
             )
-            LOGGER(__name__).info(f"Finished Processing: {post_url}")
+        await finish_post(post)
+        return None
+
+    if post["kind"] == "group":
+        await wait_turn(post)
+        async with upload_pool.lease(target_chat_id, post["uploader"]) as uploader:
+            group_sent = await upload_media_group(uploader, message, post["group"], progress_msg, batch_stats, target_chat_id)
+        if group_sent:
+            await finish_post(post)
         else:
-            if batch_stats:
-                batch_stats["processed"] += 1
-            await message.reply("**No downloadable media or text found in the post URL.**")
+            await fail_post(post, "❌ **Failed to process Media Group**")
+            if not batch_stats and progress_msg:
+                try:
+                    await progress_msg.delete()
+                except Exception:
+                    pass
+        return None
+
+    if post["order"] is not None:
+        async with upload_pool.lease(target_chat_id, post["uploader"]) as uploader:
+            try:
+                await uploader.presave_file(post["media_path"])
+            except Exception as e:
+                LOGGER(__name__).warning(f"Early upload failed for {post['filename']}, uploading on commit: {e}")
+        await wait_turn(post)
+
+    async with upload_pool.lease(target_chat_id, pinned_uploader(post)) as uploader:
+        upload_success = await send_media(
+            uploader,
+            message,
+            post["media_path"],
+            post["media_type"],
+            post["caption"],
+            progress_msg,
+            batch_stats,
+            target_chat_id,
+            reply_markup=post["keyboard"],
+            message_id=chat_message.id,
+            media_info=post["media_info"],
+            thumb=post["thumb"]
+        )
 
-    except (PeerIdInvalid, BadRequest, KeyError):
-        await message.reply("**Make sure the user client is part of the chat.**")
-    except FloodWait as e:
-        wait_s = int(getattr(e, "value", 0) or 0)
-        LOGGER(__name__).warning(f"FloodWait in handle_download: {wait_s}s")
-        if wait_s > 0:
-            await asyncio.sleep(wait_s + 1)
-        return
+    if upload_success:
+        remember_upload(chat_message, upload_success, post["media_type"])
+        await finish_post(post)
+    else:
+        post["status"] = "failed"
+    return None
+
+def borrow_download(post: dict, shared: dict) -> bool:
+    media_path = shared["media_path"]
+    if post["kind"] != "media" or not isinstance(media_path, str) or not os.path.exists(media_path):
+        return False
+    post["media_path"] = media_path
+    post["media_info"] = shared["media_info"]
+    post["thumb"] = shared["thumb"]
+    post["borrowed"] = True
+    LOGGER(__name__).info(f"Reusing in-flight download of {post['post_url']}")
+    return True
+
+def wants_download(post: dict) -> bool:
+    return post["kind"] in ("group", "media")
+
+def wants_probe(post: dict) -> bool:
+    return post["kind"] == "media" and post["media_type"] in ("video", "audio")
+
+def wants_upload(post: dict) -> bool:
+    return post["kind"] in ("group", "media", "text")
+
+POST_STAGES = (
+    ("prepare", prepare_post, None),
+    ("download", download_post, wants_download),
+    ("probe", probe_post, wants_probe),
+    ("upload", upload_post, wants_upload),
+)
+
+async def handle_download(bot: Client, message: Message, post_url: str, pre_fetched_msg: Message = None, fetch_time: float = None, progress_msg: Message = None, batch_stats: dict = None, target_chat_id: int | str | list = None):
+    post = new_post(bot, message, post_url, pre_fetched_msg, fetch_time, progress_msg, batch_stats, target_chat_id)
+    if not batch_stats:
+        MEDIA_PRIORITY.set(PRIORITY_INTERACTIVE)
+
+    try:
+        async with POST_FLIGHTS.join(get_post_key(post["post_url"])) as (leader, flight):
+            shared = None
+            if leader:
+                post["flight"] = flight
+            else:
+                shared = flight.result
+                LOGGER(__name__).info(f"Joined in-flight request for {post['post_url']}")
+                if not post["chat_message"]:
+                    post["chat_message"] = shared["chat_message"]
+            for name, handler, wants in POST_STAGES:
+                if wants and not wants(post):
+                    continue
+                if name == "download" and shared and borrow_download(post, shared):
+                    continue
+                if name == "probe" and post["borrowed"]:
+                    continue
+                if await handler(post) is None:
+                    break
     except Exception as e:
-        error_message = f"**❌ {str(e)}**"
-        await message.reply(error_message)
-        LOGGER(__name__).error(f"Error handling {post_url}: {e}")
+        await report_post_error(post, e)
     finally:
-        if media_path:
-            cleanup_download(media_path)
-        
-        elapsed = time() - task_start_time
-        if elapsed < 2.0:
-            await asyncio.sleep(2.0 - elapsed)
+        release_post(post)
 
 @bot.on_message(filters.command("batch") & filters.private)
 async def download_range(bot: Client, message: Message):
@@ -432,11 +812,12 @@ async def batch_destination_callback(bot: Client, callback_query: CallbackQuery)
     elif action == "chan":
         WAITING_FOR_CHANNEL[callback_query.from_user.id] = job
         await job["original_message"].reply(
-            "**Please send me a post link from your target channel.**\n\n"
+            "**Please send me a post link from your target channel.**\n"
+            "Send several links separated by spaces to mirror into more than one channel.\n\n"
             "> ⚠️Make me a channel Admin with 'Post Messages' rights first!"
         )
 
-async def execute_batch(bot: Client, original_msg: Message, job: dict, target_chat_id: int | str):
+async def execute_batch(bot: Client, original_msg: Message, job: dict, target_chat_id: int | str | list):
     start_chat = job["start_chat"]
     start_id = job["start_id"]
     end_id = job["end_id"]
@@ -448,44 +829,47 @@ async def execute_batch(bot: Client, original_msg: Message, job: dict, target_ch
     except Exception:
         pass
 
-    loading = await original_msg.reply(f"📥 **Started Batch Processing...**")
+    loading = ProgressEditor(await original_msg.reply(f"📥 **Started Batch Processing...**"), PyroConf.PROGRESS_INTERVAL)
     try:
         await loading.pin(disable_notification=True, both_sides=True)
     except Exception:
         pass
 
-    LOGGER(__name__).info(f"Batch Process Started | Range: {start_id} to {end_id}")
+    batch_id = job.get("batch_id")
+    if batch_id is None:
+        batch_id = JOURNAL.start_batch(job, original_msg.chat.id, get_targets(target_chat_id))
+    else:
+        JOURNAL.set_status(batch_id, "running")
+    already_sent = JOURNAL.sent_ids(batch_id)
+    ACTIVE_BATCHES.add(batch_id)
+
+    LOGGER(__name__).info(f"Batch Process Started | Batch #{batch_id} | Range: {start_id} to {end_id}")
 
-    downloaded = skipped = failed = 0
-    batch_tasks = []
-    BATCH_SIZE = PyroConf.BATCH_SIZE
+    counts = {"downloaded": 0, "skipped": 0, "failed": 0, "resumed": 0}
     processed_media_groups = set()
     
-    all_ids = list(range(start_id, end_id + 1))
-    chunk_size = 200
-    
-    total_links = len(all_ids)
+    total_links = end_id - start_id + 1
     batch_stats = {"total": total_links, "processed": 0}
 
-    rapid_file_count = 0
-    rapid_window_start = time()
+    def on_window_skip(missing: int):
+        counts["skipped"] += missing
+        batch_stats["processed"] += missing
 
-    for i in range(0, len(all_ids), chunk_size):
-        chunk_ids = all_ids[i:i + chunk_size]
-        try:
-            chunk_fetch_time = time()
-            messages = await user.get_messages(chat_id=start_chat, message_ids=chunk_ids)
-            if not isinstance(messages, list):
-                messages = [messages]
-        except Exception as e:
-            LOGGER(__name__).error(f"Error fetching chunk: {e}")
-            failed += len(chunk_ids)
-            batch_stats["processed"] += len(chunk_ids)
-            continue
-            
-        for chat_msg in messages:
+    def on_window_error(window_size: int, error: Exception):
+        counts["failed"] += window_size
+        batch_stats["processed"] += window_size
+
+    order = ReorderBuffer(PyroConf.REORDER_WINDOW) if PyroConf.REORDER_WINDOW > 0 else None
+    sequence = 0
+
+    async def batch_posts():
+        nonlocal sequence
+        async for chat_msg, chunk_fetch_time, album in prefetch_messages(
+            user, start_chat, plan_windows(start_id, end_id), BATCH_FILTERS.get(filter_type),
+            PyroConf.PREFETCH_CHUNKS, on_window_skip, on_window_error
+        ):
             if not chat_msg or chat_msg.empty:
-                skipped += 1
+                counts["skipped"] += 1
                 batch_stats["processed"] += 1
                 continue
             
@@ -494,114 +878,161 @@ async def execute_batch(bot: Client, original_msg: Message, job: dict, target_ch
             
             if chat_msg.media_group_id:
                 if chat_msg.media_group_id in processed_media_groups:
-                    skipped += 1
+                    counts["skipped"] += 1
                     batch_stats["processed"] += 1
                     continue
                 processed_media_groups.add(chat_msg.media_group_id)
 
+            if msg_id in already_sent:
+                counts["resumed"] += 1
+                batch_stats["processed"] += 1
+                continue
+
             has_media = bool(chat_msg.media_group_id or chat_msg.media)
             has_text  = bool(chat_msg.text or chat_msg.caption)
             if not (has_media or has_text):
-                skipped += 1
+                counts["skipped"] += 1
                 batch_stats["processed"] += 1
                 continue
                 
             if filter_type != "all":
                 if filter_type == "video" and not chat_msg.video:
-                    skipped += 1
+                    counts["skipped"] += 1
                     batch_stats["processed"] += 1
                     continue
                 elif filter_type == "doc" and not chat_msg.document:
-                    skipped += 1
+                    counts["skipped"] += 1
                     batch_stats["processed"] += 1
                     continue
                 elif filter_type == "audio" and not chat_msg.audio:
-                    skipped += 1
+                    counts["skipped"] += 1
                     batch_stats["processed"] += 1
                     continue
                 elif filter_type == "photo" and not chat_msg.photo:
-                    skipped += 1
+                    counts["skipped"] += 1
                     batch_stats["processed"] += 1
                     continue
 
-            task = track_task(handle_download(
-                bot, original_msg, url, 
-                pre_fetched_msg=chat_msg, 
+            post = new_post(
+                bot, original_msg, url,
+                chat_message=chat_msg,
                 fetch_time=chunk_fetch_time,
                 progress_msg=loading,
                 batch_stats=batch_stats,
                 target_chat_id=target_chat_id
-            ))
-            batch_tasks.append(task)
-            
-            if len(batch_tasks) >= BATCH_SIZE:
-                results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                for result in results:
-                    if isinstance(result, asyncio.CancelledError):
-                        try:
-                            await loading.unpin()
-                        except Exception:
-                            pass
-                        await loading.delete()
-                        LOGGER(__name__).info(f"Batch Process Cancelled. Downloaded: {downloaded} | Skipped: {skipped} | Failed: {failed}")
-                        return await original_msg.reply(
-                            f"**❌ Batch canceled** after downloading `{downloaded}` posts."
-                        )
-                    elif isinstance(result, Exception):
-                        failed += 1
-                        LOGGER(__name__).error(f"Error: {result}")
-                    else:
-                        downloaded += 1
-                        rapid_file_count += 1
-
-                if rapid_file_count >= PyroConf.RAPID_LIMIT:
-                    elapsed = time() - rapid_window_start
-                    if elapsed < PyroConf.RAPID_WINDOW_DURATION:
-                        sleep_duration = PyroConf.RAPID_WINDOW_DURATION - elapsed
-                        LOGGER(__name__).warning(f"Sleeping for {sleep_duration:.1f}s to avoid floodwait.")
-                        try:
-                            await loading.edit(f"📥 **Batch Processing...**\n> 🕘 Pausing for {int(sleep_duration)}s to avoid floodwait.")
-                        except Exception:
-                            pass
-                        await asyncio.sleep(sleep_duration)
-                    
-                    rapid_file_count = 0
-                    rapid_window_start = time()
-
-                batch_tasks.clear()
-                await asyncio.sleep(PyroConf.FLOOD_WAIT_DELAY)
+            )
+            post["batch_id"] = batch_id
+            post["album"] = album
+            if order:
+                post["order"], post["seq"] = order, sequence
+                sequence += 1
+                await order.admit(post["seq"])
+            journal_post(post, "pending")
+            yield post
+
+    async def on_complete(post: dict):
+        release_post(post)
+        if post["status"] == "failed":
+            counts["failed"] += 1
+        elif post["status"] == "skipped":
+            counts["skipped"] += 1
+        else:
+            counts["downloaded"] += 1
+        journal_post(post, post["status"])
+
+    async def on_error(post: dict, error: Exception):
+        release_post(post)
+        counts["failed"] += 1
+        journal_post(post, "failed")
+        await report_post_error(post, error)
+
+    stage_workers = {
+        "prepare": PyroConf.BATCH_SIZE,
+        "download": PyroConf.MAX_CONCURRENT_DOWNLOADS * len(USER_POOL),
+        "probe": PyroConf.PROBE_WORKERS,
+        "upload": PyroConf.MAX_CONCURRENT_UPLOADS * len(HELPER_POOL or BOT_POOL),
+    }
+    if order:
+        stage_workers["download"] = max(stage_workers["download"], order.window)
+        stage_workers["upload"] = max(stage_workers["upload"], order.window)
+    pipeline = Pipeline(
+        [Stage(name, handler, stage_workers[name], wants) for name, handler, wants in POST_STAGES],
+        queue_size=PyroConf.BATCH_SIZE,
+        on_complete=on_complete,
+        on_error=on_error,
+        on_abort=release_post
+    )
 
-    if batch_tasks:
-        results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-        for result in results:
-            if isinstance(result, Exception):
-                failed += 1
-            else:
-                downloaded += 1
+    try:
+        await pipeline.run(batch_posts())
+    except asyncio.CancelledError:
+        ACTIVE_BATCHES.discard(batch_id)
+        JOURNAL.set_status(batch_id, "cancelled")
+        try:
+            await loading.unpin()
+        except Exception:
+            pass
+        await loading.delete()
+        LOGGER(__name__).info(f"Batch Process Cancelled. Downloaded: {counts['downloaded']} | Skipped: {counts['skipped']} | Failed: {counts['failed']}")
+        return await original_msg.reply(
+            f"**❌ Batch canceled** after downloading `{counts['downloaded']}` posts.\n"
+            f"> Use `/resume {batch_id}` to continue later."
+        )
 
+    ACTIVE_BATCHES.discard(batch_id)
+    JOURNAL.set_status(batch_id, "completed")
     try:
         await loading.unpin()
     except Exception:
         pass
     await loading.delete()
-    LOGGER(__name__).info(f"Batch Process Completed | Downloaded: {downloaded} | Skipped: {skipped} | Failed: {failed}")
-    await original_msg.reply(
+    LOGGER(__name__).info(f"Batch Process Completed | Downloaded: {counts['downloaded']} | Skipped: {counts['skipped']} | Failed: {counts['failed']}")
+    summary = (
         "> ✅Batch Process Completed!\n"
         "━━━━━━━━━━━━━━━━━━━\n"
-        f"📥 **Downloaded** : {downloaded} post(s)\n"
-        f"⏭️ **Skipped** : {skipped} (no content or filtered)\n"
-        f"❌ **Failed** : {failed} error(s)"
+        f"📥 **Downloaded** : {counts['downloaded']} post(s)\n"
+        f"⏭️ **Skipped** : {counts['skipped']} (no content or filtered)\n"
+        f"❌ **Failed** : {counts['failed']} error(s)"
     )
+    if counts["resumed"]:
+        summary += f"\n♻️ **Already Sent** : {counts['resumed']} post(s)"
+    await original_msg.reply(summary)
+
+@bot.on_message(filters.command("resume") & filters.private)
+async def resume_batch(bot: Client, message: Message):
+    batches = [row for row in JOURNAL.unfinished_batches(message.chat.id) if row["batch_id"] not in ACTIVE_BATCHES]
+
+    if len(message.command) > 1:
+        try:
+            batch_id = int(message.command[1])
+        except ValueError:
+            return await message.reply("**❌ Batch ID must be a number.**")
+        batches = [row for row in batches if row["batch_id"] == batch_id]
+        if not batches:
+            return await message.reply(f"**❌ No unfinished batch #{batch_id} found.**")
+    elif not batches:
+        return await message.reply("**No unfinished batches to resume.**")
+    elif len(batches) > 1:
+        lines = [
+            f"> `/resume {row['batch_id']}` — {row['prefix']}/{row['start_id']} → {row['end_id']} ({row['sent']} sent)"
+            for row in batches[:10]
+        ]
+        return await message.reply("**Unfinished batches:**\n\n" + "\n".join(lines))
+
+    row = batches[0]
+    job = job_from_batch(row)
+    await message.reply(f"♻️ **Resuming batch #{row['batch_id']}** ({row['sent']} post(s) already sent)")
+    await track_task(execute_batch(bot, message, job, parse_chat_refs(row["target_chat_id"])))
 
-@bot.on_message(filters.private & filters.text & ~filters.command(["start", "help", "dl", "stats", "logs", "stop"]))
+@bot.on_message(filters.private & filters.text & ~filters.command(["start", "help", "dl", "stats", "logs", "stop", "resume"]))
 async def handle_any_message(bot: Client, message: Message):
     user_id = message.from_user.id
 
     if user_id in WAITING_FOR_CHANNEL:
         job = WAITING_FOR_CHANNEL.pop(user_id)
         try:
-            target_chat_id, _ = getChatMsgID(message.text)
-            await track_task(execute_batch(bot, job["original_message"], job, target_chat_id))
+            target_chat_ids = [getChatMsgID(link)[0] for link in message.text.split()]
+            await track_task(execute_batch(bot, job["original_message"], job, target_chat_ids))
         except Exception as e:
             await message.reply(f"**❌ Error parsing target link:\n{e}**")
         return
@@ -616,7 +1047,11 @@ async def download_media(bot: Client, message: Message):
         return
 
     post_url = message.command[1]
-    await track_task(handle_download(bot, message, post_url))
+    try:
+        target_chat_ids = [getChatMsgID(link)[0] for link in message.command[2:]]
+    except Exception as e:
+        return await message.reply(f"**❌ Error parsing target link:\n{e}**")
+    await track_task(handle_download(bot, message, post_url, target_chat_id=target_chat_ids or None))
 
 @bot.on_message(filters.command("stats") & filters.private)
 async def stats(_, message: Message):
@@ -640,6 +1075,19 @@ async def stats(_, message: Message):
         f"**➜ Memory Usage:** {round(process.memory_info()[0] / 1024**2)} MiB\n\n"
         f"**➜ Uploaded:** {sent}\n"
         f"**➜ Downloaded:** {recv}\n\n"
+        f"**➜ Server Copies:** {ROUTE_STATS['copied']} | "
+        f"**➜ Cache Hits:** {ROUTE_STATS['cached']} | "
+        f"**➜ Transfers:** {ROUTE_STATS['transferred']} | "
+        f"**➜ Copy Fallbacks:** {ROUTE_STATS['copy_fallbacks']}\n"
+        f"**➜ Cached Files:** {len(FILE_CACHE)}\n"
+        f"**➜ Bot RPC Rates:** {bot.rate_limiter.describe()}\n"
+        f"**➜ User RPC Rates:** {user.rate_limiter.describe()}\n"
+        f"**➜ FloodWait Blocks:** Bot: {bot.flood.describe()} | User: {user.flood.describe()}\n"
+        f"**➜ User Sessions:** {USER_POOL.describe()}\n"
+        f"**➜ Upload Bots:** {(HELPER_POOL or BOT_POOL).describe()}\n"
+        f"**➜ Media Jobs:** {MEDIA_SCHEDULER.describe()}\n"
+        f"**➜ Download Budget:** {DOWNLOAD_BUDGET.describe()}\n"
+        f"**➜ Memory Pool:** {MEMORY_BUDGET.describe()}\n\n"
         f"**➜ CPU:** {cpuUsage}% | "
         f"**➜ RAM:** {memory}% | "
         f"**➜ DISK:** {disk}%"
@@ -665,7 +1113,7 @@ async def cancel_all_tasks(_, message: Message):
 if __name__ == "__main__":
     LOGGER(__name__).info("Bot Started!")
     try:
-        compose([bot, user])
+        compose([bot, user, *extra_users, *helper_bots])
     except KeyboardInterrupt:
         pass
     except Exception as e: